@@ -0,0 +1,201 @@
+"""
+Throughput and memory benchmarks for analyze_code and the analyze CLI.
+
+Usage:
+    python benchmarks/bench_analyzer.py [--profiles small huge ...] [--scale 1.0]
+                                        [--repeat 3] [--output results.json]
+                                        [--compare previous.json]
+
+For every synthetic corpus profile this reports parse time, the time of
+each rule run on its own over the parsed trees, analyze_code files/sec
+and peak traced memory, and the wall time and peak RSS of a fresh
+``coderevitalize analyze`` process. Results are printed (and optionally
+written) as JSON; ``--compare`` prints the ratio against an older run.
+"""
+import argparse
+import ast
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus  # noqa: E402
+from coderevitalize import __version__  # noqa: E402
+from coderevitalize.analyzer import TodoCommentAnalyzer, analyze_code, analyze_complexity  # noqa: E402
+from coderevitalize.config import Config  # noqa: E402
+from coderevitalize.engine import RULES, run_rules  # noqa: E402
+
+
+def best_of(repeat, func):
+    """Run ``func`` ``repeat`` times and return the fastest wall time."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_rules(sources, trees, config, repeat):
+    def run_rule(rule_cls):
+        for tree in trees:
+            rule = rule_cls.from_config(config)
+            run_rules(tree, [rule])
+            rule.finalize()
+
+    def run_complexity():
+        for source, tree in zip(sources, trees):
+            analyze_complexity(source, config.max_complexity, tree=tree)
+
+    def run_todo():
+        for source in sources:
+            TodoCommentAnalyzer().analyze(source)
+
+    timings = {rule_cls.__name__: best_of(repeat, lambda: run_rule(rule_cls)) for rule_cls in RULES}
+    timings["analyze_complexity"] = best_of(repeat, run_complexity)
+    timings["TodoCommentAnalyzer"] = best_of(repeat, run_todo)
+    return timings
+
+
+def bench_analyze_code(sources, config, repeat):
+    def run():
+        for source in sources:
+            analyze_code(source, config=config)
+
+    seconds = best_of(repeat, run)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def bench_cli(root, repeat, jobs):
+    # Every corpus file is analyzed: the huge profile's are over the default max_file_size
+    config_path = os.path.join(root, "benchmark.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write("max_file_size: 0\n")
+    output_path = os.path.join(root, "output.json")
+    command = [
+        sys.executable, "-m", "coderevitalize.cli", "analyze", root, "--config", config_path,
+        "--format", "json", "--no-cache", "--jobs", str(jobs),
+    ]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [sys.path[0], os.environ.get("PYTHONPATH")])))
+
+    peaks = []
+
+    def run():
+        with open(output_path, "wb") as f:
+            process = subprocess.Popen(command, stdout=f, env=env)
+            if not hasattr(os, "wait4"):  # not available on Windows
+                process.wait()
+                return
+            # Only this run's usage: RUSAGE_CHILDREN keeps the largest child seen so far
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = status  # already reaped
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peaks.append(usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024))
+
+    seconds = best_of(repeat, run)
+    with open(output_path, "r", encoding="utf-8") as f:
+        if not json.load(f)["summary"]["total_issues"]:
+            raise RuntimeError(f"The CLI reported no findings for {root}; were the files skipped?")
+    return seconds, max(peaks, default=None)
+
+
+def bench_profile(profile, scale, seed, repeat, jobs):
+    files = corpus.generate(profile, scale, seed)
+    sources = [source for _, source in files]
+    config = Config()
+
+    parse_seconds = best_of(repeat, lambda: [ast.parse(source) for source in sources])
+    trees = [ast.parse(source) for source in sources]
+    rule_seconds = bench_rules(sources, trees, config, repeat)
+    analyze_seconds, analyze_peak = bench_analyze_code(sources, config, repeat)
+
+    with tempfile.TemporaryDirectory() as root:
+        total_bytes = corpus.write(files, root)
+        cli_seconds, cli_peak_rss = bench_cli(root, repeat, jobs)
+
+    return {
+        "files": len(files),
+        "bytes": total_bytes,
+        "parse_seconds": parse_seconds,
+        "rule_seconds": rule_seconds,
+        "analyze_code": {
+            "seconds": analyze_seconds,
+            "files_per_second": len(files) / analyze_seconds,
+            "peak_traced_bytes": analyze_peak,
+        },
+        "cli": {
+            "jobs": jobs,
+            "seconds": cli_seconds,
+            "files_per_second": len(files) / cli_seconds,
+            "peak_rss_bytes": cli_peak_rss,
+        },
+    }
+
+
+def compare(results, baseline):
+    """Print current/baseline time ratios for the timings both runs share."""
+    for profile, current in results["profiles"].items():
+        previous = baseline.get("profiles", {}).get(profile)
+        if not previous:
+            continue
+        rows = [("parse", current["parse_seconds"], previous["parse_seconds"])]
+        rows += [
+            (name, seconds, previous["rule_seconds"].get(name))
+            for name, seconds in current["rule_seconds"].items()
+        ]
+        rows.append(("analyze_code", current["analyze_code"]["seconds"], previous["analyze_code"]["seconds"]))
+        rows.append(("cli", current["cli"]["seconds"], previous["cli"]["seconds"]))
+        print(f"{profile}:", file=sys.stderr)
+        for name, now, before in rows:
+            if before:
+                print(f"  {name:<28} {now / before:6.2f}x", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark analyzer throughput and memory.")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(corpus.PROFILES), default=sorted(corpus.PROFILES))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the number of files per profile.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Report the best of this many runs.")
+    parser.add_argument("--jobs", type=int, default=1, help="--jobs passed to the CLI run.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--compare", help="A previous results file to compare against.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "profiles": {
+            profile: bench_profile(profile, args.scale, args.seed, args.repeat, args.jobs)
+            for profile in args.profiles
+        },
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    with contextlib.suppress(BrokenPipeError):
+        main()
@@ -0,0 +1,93 @@
+"""
+Measure file reading and analysis throughput on a tree with vendored files.
+
+Usage: python benchmarks/bench_reader.py [--scale 1.0] [--repeat 3]
+
+Builds a project from the "medium" corpus plus a vendor/ directory of
+large generated and minified modules, then times reading every file
+with plain ``read()`` and with ``read_source``, and running
+``process_file`` over the tree with and without skipping generated,
+minified and oversized files. Prints the timings as JSON.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus  # noqa: E402
+from bench_analyzer import best_of  # noqa: E402
+from coderevitalize.cli import discover_files, process_file  # noqa: E402
+from coderevitalize.config import Config  # noqa: E402
+from coderevitalize.reader import SkippedFile, read_source  # noqa: E402
+
+
+def vendored_files(scale, seed=0):
+    """Return ``(relative_path, source)`` pairs for large generated and minified modules."""
+    files = []
+    for index, (_, source) in enumerate(corpus.generate("huge", scale, seed)):
+        files.append((os.path.join("vendor", f"generated_{index}.py"),
+                      "# @generated by a code generator. DO NOT EDIT.\n" + source))
+        minified = ";".join(line.strip() for line in source.splitlines() if line.startswith("import "))
+        body = ";".join(f"v{i}={i}*{i + 1}" for i in range(int(20000 * scale) + 100))
+        files.append((os.path.join("vendor", f"minified_{index}.py"), minified + "\n" + body + "\n"))
+    return files
+
+
+def read_all(paths):
+    for path in paths:
+        with open(path, "rb") as f:
+            f.read()
+
+
+def read_all_sources(paths, config):
+    for path in paths:
+        try:
+            read_source(path, config.max_file_size, config.skip_generated)
+        except SkippedFile:
+            pass
+
+
+def process_all(paths, config):
+    # Skipped files are reported on stderr; keep that out of the timings
+    with contextlib.redirect_stderr(io.StringIO()):
+        return sum(len(process_file(path, config)) for path in paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark file reading on a tree with vendored files.")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    skipping = Config()
+    everything = Config(max_file_size=0, skip_generated=False)
+
+    with tempfile.TemporaryDirectory() as root:
+        total_bytes = corpus.write(corpus.generate("medium", args.scale) + vendored_files(args.scale), root)
+        paths = list(discover_files(root, skipping))
+
+        plain = best_of(args.repeat, lambda: read_all(paths))
+        sniffing = best_of(args.repeat, lambda: read_all_sources(paths, skipping))
+        analyze_all = best_of(args.repeat, lambda: process_all(paths, everything))
+        analyze_skipping = best_of(args.repeat, lambda: process_all(paths, skipping))
+
+    megabytes = total_bytes / (1024 * 1024)
+    print(json.dumps({
+        "benchmark": "reader",
+        "files": len(paths),
+        "bytes": total_bytes,
+        "read": {"seconds": plain, "mb_per_second": megabytes / plain},
+        "read_source": {"seconds": sniffing, "mb_per_second": megabytes / sniffing},
+        "process_all": {"seconds": analyze_all, "mb_per_second": megabytes / analyze_all},
+        "process_skipping": {"seconds": analyze_skipping, "mb_per_second": megabytes / analyze_skipping},
+        "skipping_speedup": analyze_all / analyze_skipping,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
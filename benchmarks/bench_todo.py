@@ -0,0 +1,66 @@
+"""
+Compare the TODO/FIXME scanner against the original line-by-line version.
+
+Usage: python benchmarks/bench_todo.py [--scale 1.0] [--repeat 3]
+
+Runs the original implementation (split into lines, compile the pattern,
+search each line) and TodoCommentAnalyzer in its fast and accurate modes
+over the "huge" synthetic corpus, and prints the timings as JSON.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus  # noqa: E402
+from bench_analyzer import best_of  # noqa: E402
+from coderevitalize.analyzer import TodoCommentAnalyzer  # noqa: E402
+
+
+def legacy_scan(source_code):
+    """The original TodoCommentAnalyzer.analyze loop, without building findings."""
+    hits = []
+    todo_pattern = re.compile(r'#.*\b(TODO|FIXME|HACK|XXX|OPTIMIZE)\b', re.IGNORECASE)
+    for line_num, line in enumerate(source_code.split('\n'), 1):
+        match = todo_pattern.search(line)
+        if match:
+            hits.append((line_num, match.group(1).upper(), line.strip()))
+    return hits
+
+
+def scan(source_code, accurate):
+    analyzer = TodoCommentAnalyzer(accurate=accurate)
+    analyzer.analyze(source_code)
+    return analyzer.findings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TODO comment scanning.")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    sources = [source for _, source in corpus.generate("huge", args.scale)]
+    total_bytes = sum(len(source) for source in sources)
+
+    legacy = best_of(args.repeat, lambda: [legacy_scan(s) for s in sources])
+    fast = best_of(args.repeat, lambda: [scan(s, False) for s in sources])
+    accurate = best_of(args.repeat, lambda: [scan(s, True) for s in sources])
+
+    print(json.dumps({
+        "benchmark": "todo_comments",
+        "files": len(sources),
+        "bytes": total_bytes,
+        "findings": sum(len(scan(s, False)) for s in sources),
+        "legacy_seconds": legacy,
+        "fast_seconds": fast,
+        "accurate_seconds": accurate,
+        "fast_speedup": legacy / fast,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Reproducible synthetic Python corpora for the benchmarks.
+
+Every profile is generated from a seeded ``random.Random`` so the same
+profile, scale and seed always produce byte-identical sources.
+"""
+import os
+import random
+
+STDLIB_MODULES = [
+    "os", "sys", "re", "json", "math", "time", "random", "itertools", "functools",
+    "collections", "typing", "pathlib", "logging", "subprocess", "datetime",
+]
+
+
+def _function(rng, index, statements, numeric_ratio=0.2, depth=0):
+    args = ", ".join(f"arg{i}" for i in range(rng.randint(0, 8)))
+    lines = [f"def func_{index}({args}):"]
+    if rng.random() < 0.5:
+        lines.append(f'    """Docstring for func_{index}."""')
+    indent = "    "
+    for level in range(depth):
+        lines.append(f"{indent}if arg_check({level}):")
+        indent += "    "
+    for i in range(statements):
+        if rng.random() < numeric_ratio:
+            lines.append(f"{indent}value_{i} = {rng.randint(3, 10000)} * {rng.random() * 100:.3f}")
+        elif rng.random() < 0.1:
+            lines.append(f"{indent}# TODO: revisit step {i}")
+        elif rng.random() < 0.2:
+            lines.append(f"{indent}if value_{i - 1 if i else 0} > {i}:")
+            lines.append(f"{indent}    value_{i} = os.path.join('a', str({i}))")
+        else:
+            lines.append(f"{indent}value_{i} = helper_{rng.randint(0, 50)}(value_{max(i - 1, 0)})")
+    lines.append(f"{indent}return None")
+    return "\n".join(lines)
+
+
+def _module(rng, functions, statements, imports=4, numeric_ratio=0.2, depth=0):
+    chosen = rng.sample(STDLIB_MODULES, min(imports, len(STDLIB_MODULES)))
+    chosen += [f"vendor_pkg_{i}" for i in range(max(0, imports - len(STDLIB_MODULES)))]
+    parts = [f"import {name}" for name in chosen]
+    parts.append("")
+    for index in range(functions):
+        parts.append(_function(rng, index, statements, numeric_ratio, depth))
+        parts.append("")
+    return "\n".join(parts) + "\n"
+
+
+# name: (file count, module generator) at scale 1.0
+PROFILES = {
+    "small": (400, lambda rng: _module(rng, functions=3, statements=5)),
+    "medium": (100, lambda rng: _module(rng, functions=25, statements=20)),
+    "huge": (4, lambda rng: _module(rng, functions=1500, statements=30)),
+    "deep_nesting": (50, lambda rng: _module(rng, functions=10, statements=10, depth=40)),
+    "numeric_heavy": (50, lambda rng: _module(rng, functions=20, statements=40, numeric_ratio=0.9)),
+    "many_imports": (100, lambda rng: _module(rng, functions=5, statements=5, imports=200)),
+}
+
+
+def generate(profile, scale=1.0, seed=0):
+    """Return a list of ``(relative_path, source)`` pairs for ``profile``."""
+    count, make_module = PROFILES[profile]
+    rng = random.Random(f"{profile}:{seed}")
+    files = []
+    for index in range(max(1, int(count * scale))):
+        files.append((os.path.join(f"pkg{index % 10}", f"mod_{index}.py"), make_module(rng)))
+    return files
+
+
+def write(files, root):
+    """Write generated ``files`` below ``root`` and return the total bytes."""
+    total = 0
+    for relative_path, source in files:
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        total += len(source.encode("utf-8"))
+    return total
@@ -0,0 +1,51 @@
+"""
+Measure how long a fresh interpreter takes to import the CLI.
+
+Usage: python benchmarks/import_time.py [--runs N] [--module coderevitalize.cli]
+
+Prints a JSON object with the median and best wall time over N fresh
+interpreters, the interpreter's own baseline and the modules loaded.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_import(statement, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="coderevitalize.cli")
+    args = parser.parse_args(argv)
+
+    baseline = time_import("pass", args.runs)
+    timings = time_import(f"import {args.module}", args.runs)
+    modules = subprocess.run(
+        [sys.executable, "-c", f"import sys, {args.module}; print(len(sys.modules))"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+    print(json.dumps({
+        "benchmark": "import_time",
+        "module": args.module,
+        "runs": args.runs,
+        "median_seconds": statistics.median(timings),
+        "best_seconds": min(timings),
+        "interpreter_median_seconds": statistics.median(baseline),
+        "modules_loaded": int(modules),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ This package provides functionality to detect:
 """
 
 from .analyzer import analyze_code, ArgumentCountAnalyzer, FunctionLengthAnalyzer, analyze_complexity
+from .finding import Finding
 from .formatters import TextFormatter, JsonFormatter, get_formatter
 
 __version__ = "0.1.0"
@@ -19,6 +20,7 @@ __all__ = [
     "ArgumentCountAnalyzer", 
     "FunctionLengthAnalyzer",
     "analyze_complexity",
+    "Finding",
     "TextFormatter",
     "JsonFormatter", 
     "get_formatter"
@@ -1,27 +1,61 @@
 import os
-from openai import OpenAI
+import threading
 
-def get_ai_response(prompt):
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# One client, and so one HTTP connection pool, per API key and base URL.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """Return the shared OpenAI client for ``api_key``, creating it on first use."""
+    # Imported here so that analysis-only runs never pay for the OpenAI SDK.
+    from openai import OpenAI
+
+    base_url = os.getenv("OPENAI_BASE_URL")
+    with _clients_lock:
+        client = _clients.get((api_key, base_url))
+        if client is None:
+            options = {"base_url": base_url} if base_url else {}
+            client = _clients[(api_key, base_url)] = OpenAI(api_key=api_key, **options)
+    return client
+
+
+def get_ai_response(prompt, model=DEFAULT_MODEL, max_tokens=2048, temperature=0.5, cache=None):
     """
     Gets a response from a code generation AI.
+
+    If ``cache`` is a ``ResponseCache``, a response already given for the
+    same model, prompt and parameters is returned without a request.
+    Errors are returned as text and never cached.
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable not set.")
 
+    if cache is not None:
+        key = cache.key(model, prompt, {"max_tokens": max_tokens, "temperature": temperature})
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     try:
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = get_client(api_key).chat.completions.create(
+            model=model,
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=2048,
+            max_tokens=max_tokens,
             n=1,
             stop=None,
-            temperature=0.5,
+            temperature=temperature,
         )
-        return response.choices[0].message.content.strip()
+        text = response.choices[0].message.content.strip()
     except Exception as e:
         return f"Error interacting with AI: {e}"
+
+    if cache is not None:
+        cache.put(key, text)
+    return text
@@ -1,9 +1,18 @@
 import ast
 import re
-from radon.visitors import ComplexityVisitor
+import sys
+import time
+from importlib.util import decode_source
+
 from .ai import get_ai_response
+from .config import Config
+from .duplicates import DuplicateIndex, duplicate_finding, fingerprint
+from .finding import Finding
+from .engine import BudgetExceeded, Rule, RULES, register_rule, run_rules
+from .profiling import timed
 
-class ArgumentCountAnalyzer(ast.NodeVisitor):
+@register_rule
+class ArgumentCountAnalyzer(Rule):
     """
     Analyzes Python source code to find functions with too many arguments.
     """
@@ -12,6 +21,10 @@ class ArgumentCountAnalyzer(ast.NodeVisitor):
         self.max_args = max_args
         self.findings = []
 
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_args=config.max_args)
+
     def visit_FunctionDef(self, node):
         args = node.args.args
         num_args = len(args)
@@ -27,18 +40,20 @@ class ArgumentCountAnalyzer(ast.NodeVisitor):
                 message += " (excluding self)"
             message += f", which is more than the allowed {self.max_args}."
 
-            self.findings.append({
-                "type": "argument_count",
-                "function_name": node.name,
-                "line_number": node.lineno,
-                "value": num_args,
-                "severity": "high",
-                "message": message,
-                "suggestion": "Consider grouping related parameters into a class or dictionary."
-            })
-        self.generic_visit(node)
+            self.findings.append(Finding(
+                type="argument_count",
+                function_name=node.name,
+                line_number=node.lineno,
+                value=num_args,
+                severity="high",
+                message=message,
+                suggestion="Consider grouping related parameters into a class or dictionary."
+            ))
 
-class FunctionLengthAnalyzer(ast.NodeVisitor):
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+@register_rule
+class FunctionLengthAnalyzer(Rule):
     """
     Analyzes Python source code to find functions that are too long.
     """
@@ -47,72 +62,237 @@ class FunctionLengthAnalyzer(ast.NodeVisitor):
         self.max_lines = max_lines
         self.findings = []
 
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_lines=config.max_lines)
+
     def visit_FunctionDef(self, node):
         # This requires Python 3.8+ for end_lineno
         if hasattr(node, 'end_lineno'):
             num_lines = node.end_lineno - node.lineno + 1
             if num_lines > self.max_lines:
-                self.findings.append({
-                    "type": "function_length",
-                    "function_name": node.name,
-                    "line_number": node.lineno,
-                    "value": num_lines,
-                    "severity": "medium",
-                    "message": f"Function '{node.name}' has {num_lines} lines, which is more than the allowed {self.max_lines}.",
-                    "suggestion": "Consider breaking this function into smaller, more focused functions."
-                })
-        self.generic_visit(node)
+                self.findings.append(Finding(
+                    type="function_length",
+                    function_name=node.name,
+                    line_number=node.lineno,
+                    value=num_lines,
+                    severity="medium",
+                    message=f"Function '{node.name}' has {num_lines} lines, which is more than the allowed {self.max_lines}.",
+                    suggestion="Consider breaking this function into smaller, more focused functions."
+                ))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+class _Scope:
+    """Names bound, imported and loaded in one module, class or function scope."""
 
+    __slots__ = ("is_class", "imports", "bindings", "declared", "globals", "loads", "free")
 
-class UnusedImportAnalyzer(ast.NodeVisitor):
+    def __init__(self, is_class=False):
+        self.is_class = is_class
+        self.imports = {}       # bound name -> [[line_number, imported name, used], ...]
+        self.bindings = set()   # names bound here other than by imports
+        self.declared = set()   # names declared global or nonlocal
+        self.globals = set()    # names declared global
+        self.loads = set()      # names loaded here before any import of them
+        self.free = set()       # names nested function scopes left unresolved
+
+
+@register_rule
+class UnusedImportAnalyzer(Rule):
     """
     Analyzes Python source code to find unused imports.
+
+    Tracks module, class, function and comprehension scopes in the
+    engine's single traversal: a use resolves to the innermost scope that
+    binds the name, skipping class scopes from nested functions, so a
+    same-named local does not hide an unused import. Loads in a class
+    body always reach the enclosing scope too, and importing a name
+    declared ``global`` or ``nonlocal`` binds it in the scope it refers
+    to. Each import statement is tracked on its own line, and names
+    deleted or listed in a literal ``__all__`` count as used. A scope's tables are dropped as soon as the
+    scope ends.
     """
 
+    check = "unused_imports"
+
     def __init__(self):
-        self.imports = {}  # {name: line_number}
-        self.used_names = set()
+        self.scopes = [_Scope()]
         self.findings = []
+        self._unused = []
+        self._outer = set()  # ids of Name nodes already handled in an enclosing scope
+
+    # Uses
+
+    def _use(self, scope, name):
+        records = scope.imports.get(name)
+        if records is None:
+            scope.loads.add(name)
+        elif not records[-1][2]:
+            for record in records:
+                record[2] = True
+
+    def visit_Name(self, node):
+        if self._outer and id(node) in self._outer:
+            self._outer.discard(id(node))
+            return
+        if isinstance(node.ctx, ast.Store):
+            self.scopes[-1].bindings.add(node.id)
+        else:
+            # "del name" counts as a use, as in "import zlib; del zlib"
+            self._use(self.scopes[-1], node.id)
+
+    def _use_outside(self, nodes):
+        """Record the names in ``nodes``, evaluated in the enclosing scope, as used there."""
+        scope = self.scopes[-1]
+        for expr in nodes:
+            if expr is None:
+                continue
+            for child in ast.walk(expr):
+                if isinstance(child, ast.Name):
+                    self._outer.add(id(child))
+                    if isinstance(child.ctx, ast.Load):
+                        self._use(scope, child.id)
+
+    def visit_Assign(self, node):
+        if len(self.scopes) == 1:
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "__all__":
+                    self._use_exports(node.value)
+
+    def visit_AugAssign(self, node):
+        if len(self.scopes) == 1 and isinstance(node.target, ast.Name) and node.target.id == "__all__":
+            self._use_exports(node.value)
+
+    def _use_exports(self, value):
+        if isinstance(value, (ast.List, ast.Tuple)):
+            for element in value.elts:
+                if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                    self._use(self.scopes[0], element.value)
+
+    # Bindings
+
+    def _import(self, name, line_number, imported_name):
+        self._binding_scope(name).imports.setdefault(name, []).append([line_number, imported_name, False])
+
+    def _binding_scope(self, name):
+        """Return the scope a binding of ``name`` in the current scope goes to."""
+        scope = self.scopes[-1]
+        if name in scope.globals:
+            return self.scopes[0]
+        if name in scope.declared:
+            # nonlocal: the nearest enclosing function scope that binds it
+            for outer in reversed(self.scopes[1:-1]):
+                if outer.is_class:
+                    continue
+                if name in outer.globals:
+                    return self.scopes[0]
+                if name not in outer.declared and (name in outer.bindings or name in outer.imports):
+                    return outer
+        return scope
 
     def visit_Import(self, node):
         for alias in node.names:
-            name = alias.asname if alias.asname else alias.name
-            self.imports[name] = node.lineno
+            if alias.asname:
+                self._import(alias.asname, node.lineno, alias.asname)
+            else:
+                # "import a.b.c" binds "a"
+                self._import(alias.name.split(".")[0], node.lineno, alias.name)
 
     def visit_ImportFrom(self, node):
+        if node.module == "__future__":
+            return
         for alias in node.names:
-            name = alias.asname if alias.asname else alias.name
-            self.imports[name] = node.lineno
+            if alias.name != '*':
+                name = alias.asname if alias.asname else alias.name
+                self._import(name, node.lineno, name)
 
-    def visit_Name(self, node):
-        self.used_names.add(node.id)
+    def visit_arg(self, node):
+        self.scopes[-1].bindings.add(node.arg)
 
-    def visit_Attribute(self, node):
-        # For cases like os.path, we need to track the base name
-        if isinstance(node.value, ast.Name):
-            self.used_names.add(node.value.id)
-        self.generic_visit(node)
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self.scopes[-1].bindings.add(node.name)
+
+    def visit_Global(self, node):
+        self.scopes[-1].declared.update(node.names)
+        self.scopes[-1].globals.update(node.names)
+
+    def visit_Nonlocal(self, node):
+        self.scopes[-1].declared.update(node.names)
+
+    # Scopes
+
+    def _open_function(self, node):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            self.scopes[-1].bindings.add(node.name)
+            args = node.args
+            self._use_outside(node.decorator_list + args.defaults + args.kw_defaults + [node.returns])
+            self._use_outside(arg.annotation for arg in args.posonlyargs + args.args + args.kwonlyargs)
+            self._use_outside(arg.annotation for arg in (args.vararg, args.kwarg) if arg is not None)
+        elif isinstance(node, ast.Lambda):
+            self._use_outside(node.args.defaults + node.args.kw_defaults)
+        self.scopes.append(_Scope())
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_Lambda = _open_function
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _open_function
+
+    def visit_ClassDef(self, node):
+        self.scopes[-1].bindings.add(node.name)
+        self._use_outside(node.decorator_list + node.bases + [keyword.value for keyword in node.keywords])
+        self.scopes.append(_Scope(is_class=True))
+
+    def _close_scope(self, node=None):
+        scope = self.scopes.pop()
+        parent = self.scopes[-1] if self.scopes else None
+        for name in scope.loads:
+            self._resolve(scope, name, parent)
+        for name in scope.free:
+            if scope.is_class:
+                if parent is not None:
+                    parent.free.add(name)
+            else:
+                self._resolve(scope, name, parent)
+        for name, records in scope.imports.items():
+            self._unused.extend(record for record in records if not record[2])
+
+    leave_FunctionDef = leave_AsyncFunctionDef = leave_Lambda = leave_ClassDef = _close_scope
+    leave_ListComp = leave_SetComp = leave_DictComp = leave_GeneratorExp = _close_scope
+
+    def _resolve(self, scope, name, parent):
+        records = scope.imports.get(name)
+        if records is not None:
+            for record in records:
+                record[2] = True
+        elif (scope.is_class or name not in scope.bindings or name in scope.declared) and parent is not None:
+            # A class body may load a name before binding it, as in "os = os"
+            parent.free.add(name)
 
     def finalize(self):
         """Call this after visiting the entire tree to generate findings."""
-        for name, line_number in self.imports.items():
-            if name not in self.used_names and name != '*':
-                self.findings.append({
-                    "type": "unused_imports",
-                    "function_name": None,
-                    "line_number": line_number,
-                    "value": name,
-                    "severity": "low",
-                    "message": f"Unused import '{name}' found.",
-                    "suggestion": "Remove this unused import to clean up the code."
-                })
+        while self.scopes:
+            self._close_scope()
+        for line_number, name, _ in sorted(self._unused):
+            self.findings.append(Finding(
+                type="unused_imports",
+                function_name=None,
+                line_number=line_number,
+                value=name,
+                severity="low",
+                message=f"Unused import '{name}' found.",
+                suggestion="Remove this unused import to clean up the code."
+            ))
 
 
-class MissingDocstringAnalyzer(ast.NodeVisitor):
+@register_rule
+class MissingDocstringAnalyzer(Rule):
     """
     Analyzes Python source code to find functions missing docstrings.
     """
 
+    check = "missing_docstrings"
+
     def __init__(self):
         self.findings = []
 
@@ -127,23 +307,27 @@ class MissingDocstringAnalyzer(ast.NodeVisitor):
         
         # Skip private functions (starting with _) unless they're special methods
         if not has_docstring and not (node.name.startswith('_') and not node.name.startswith('__')):
-            self.findings.append({
-                "type": "missing_docstrings", 
-                "function_name": node.name,
-                "line_number": node.lineno,
-                "value": node.name,
-                "severity": "low",
-                "message": f"Missing docstring for function '{node.name}'.",
-                "suggestion": "Add a docstring to describe what this function does."
-            })
-        self.generic_visit(node)
+            self.findings.append(Finding(
+                type="missing_docstrings",
+                function_name=node.name,
+                line_number=node.lineno,
+                value=node.name,
+                severity="low",
+                message=f"Missing docstring for function '{node.name}'.",
+                suggestion="Add a docstring to describe what this function does."
+            ))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
 
 
-class MagicNumberAnalyzer(ast.NodeVisitor):
+@register_rule
+class MagicNumberAnalyzer(Rule):
     """
     Analyzes Python source code to find magic numbers.
     """
 
+    check = "magic_numbers"
+
     def __init__(self):
         self.findings = []
         self.allowed_numbers = {0, 1, -1, 2}  # Common acceptable numbers
@@ -152,143 +336,843 @@ class MagicNumberAnalyzer(ast.NodeVisitor):
         if (isinstance(node.value, (int, float)) and 
             node.value not in self.allowed_numbers and
             not isinstance(node.value, bool)):  # Exclude True/False
-            self.findings.append({
-                "type": "magic_numbers",
-                "function_name": None,
-                "line_number": node.lineno,
-                "value": node.value,
-                "severity": "low", 
-                "message": f"Magic number {node.value} found.",
-                "suggestion": "Consider using a named constant instead of a magic number."
-            })
-        self.generic_visit(node)
+            self.findings.append(Finding(
+                type="magic_numbers",
+                function_name=None,
+                line_number=node.lineno,
+                value=node.value,
+                severity="low",
+                message=f"Magic number {node.value} found.",
+                suggestion="Consider using a named constant instead of a magic number."
+            ))
+
+
+class LoopRule(Rule):
+    """
+    Base class for rules about code evaluated on every iteration of a loop.
+
+    Keeps ``self.loops``, the loops enclosing the current node within its
+    function, as ``(loop, evaluated_once, state)`` records: ``for`` and
+    ``while`` statements and comprehensions. The iterable of a ``for``
+    loop, or of a comprehension's first ``for``, is evaluated once.
+    ``state`` is whatever ``enter_loop`` returned for the loop.
+    """
+
+    def __init__(self):
+        self.findings = []
+        self.loops = []
+        self.function_name = None
+        self._scopes = []  # (function name, loops) of the enclosing scopes
+
+    def enter_loop(self, node):
+        """Called when a loop starts, before it is pushed; the result is kept in its record."""
+
+    def exit_loop(self, node, state):
+        """Called once the whole loop has been visited."""
+
+    def in_loop(self, node):
+        """Check whether ``node`` is evaluated on every iteration of an enclosing loop."""
+        if not self.loops:
+            return False
+        once = self.loops[-1][1]
+        if once is None or len(self.loops) > 1:
+            return True
+        position = (node.lineno, node.col_offset)
+        return not ((once.lineno, once.col_offset) <= position <= (once.end_lineno, once.end_col_offset))
+
+    def _visit_loop(self, node):
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            once = node.iter
+        elif isinstance(node, ast.While):
+            once = None
+        else:
+            once = node.generators[0].iter
+        self.loops.append((node, once, self.enter_loop(node)))
+
+    def _leave_loop(self, node):
+        _, _, state = self.loops.pop()
+        self.exit_loop(node, state)
+
+    visit_For = visit_AsyncFor = visit_While = _visit_loop
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _visit_loop
+    leave_For = leave_AsyncFor = leave_While = _leave_loop
+    leave_ListComp = leave_SetComp = leave_DictComp = leave_GeneratorExp = _leave_loop
+
+    def _visit_scope(self, node):
+        # The body of a function defined in a loop does not run with the loop
+        self._scopes.append((self.function_name, self.loops))
+        self.loops = []
+        if not isinstance(node, (ast.Lambda, ast.ClassDef)):
+            self.function_name = node.name
+
+    def _leave_scope(self, node):
+        self.function_name, self.loops = self._scopes.pop()
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_Lambda = visit_ClassDef = _visit_scope
+    leave_FunctionDef = leave_AsyncFunctionDef = leave_Lambda = leave_ClassDef = _leave_scope
+
+    def report(self, finding_type, node, value, severity, message, suggestion):
+        self.findings.append(Finding(
+            type=finding_type,
+            function_name=self.function_name,
+            line_number=node.lineno,
+            value=value,
+            severity=severity,
+            message=message,
+            suggestion=suggestion
+        ))
+
+
+def _is_string(node):
+    """Check whether the expression ``node`` obviously builds a string."""
+    # Walk down the left operands of "a + b + ...": chains can be long
+    while isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        if isinstance(node.op, ast.Add) and _is_string(node.right):
+            return True
+        node = node.left
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.JoinedStr):
+        return True
+    if isinstance(node, ast.Call):
+        func = node.func
+        return ((isinstance(func, ast.Name) and func.id == "str")
+                or (isinstance(func, ast.Attribute) and func.attr == "format" and _is_string(func.value)))
+    return False
+
+
+def _dotted_name(node):
+    """Return ``"a.b.c"`` for a chain of attributes on a name, or None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+@register_rule
+class StringConcatInLoopAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find strings built with ``+=`` in loops.
+
+    Each concatenation may copy the whole string built so far, making
+    the loop quadratic. A name counts as a string once the function
+    assigns it a string literal, f-string or ``str()`` call.
+    """
+
+    check = "string_concat_in_loop"
+
+    def __init__(self):
+        super().__init__()
+        self.values = {}  # name -> value last assigned to it, None once known to be a string
+        self._saved = []
+
+    def _visit_scope(self, node):
+        super()._visit_scope(node)
+        self._saved.append(self.values)
+        self.values = {}
+
+    def _leave_scope(self, node):
+        super()._leave_scope(node)
+        self.values = self._saved.pop()
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_Lambda = visit_ClassDef = _visit_scope
+    leave_FunctionDef = leave_AsyncFunctionDef = leave_Lambda = leave_ClassDef = _leave_scope
+
+    def visit_Assign(self, node):
+        value = node.value
+        for target in node.targets:
+            if not isinstance(target, ast.Name):
+                continue
+            if (isinstance(value, ast.BinOp) and isinstance(value.op, ast.Add)
+                    and isinstance(value.left, ast.Name) and value.left.id == target.id):
+                self._check(node, target.id, value.right)
+            else:
+                # Only checked for being a string once it is concatenated in a loop
+                self.values[target.id] = value
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+            self._check(node, node.target.id, node.value)
+
+    def _check(self, node, name, value):
+        if not self.in_loop(node):
+            return
+        known = self.values.get(name, False)
+        if known is None or (known is not False and _is_string(known)) or _is_string(value):
+            self.values[name] = None
+            self.report(
+                "string_concat_in_loop", node, name, "medium",
+                f"String '{name}' is built by concatenation inside a loop.",
+                "Collect the parts in a list and join them once after the loop."
+            )
+
+
+@register_rule
+class ListFrontInLoopAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find ``insert(0, ...)`` and ``pop(0)``
+    calls in loops, which shift every element of a list.
+    """
+
+    check = "list_front_in_loop"
+
+    def visit_Call(self, node):
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and node.args and not node.keywords):
+            return
+        first = node.args[0]
+        if not (isinstance(first, ast.Constant) and first.value == 0 and not isinstance(first.value, bool)):
+            return
+        if (func.attr, len(node.args)) in (("insert", 2), ("pop", 1)) and self.in_loop(node):
+            call = f"{func.attr}(0{', ...' if func.attr == 'insert' else ''})"
+            self.report(
+                "list_front_in_loop", node, call, "medium",
+                f"'{call}' inside a loop moves every element of the list on each call.",
+                "Use a collections.deque with appendleft() or popleft() instead."
+            )
+
+
+@register_rule
+class ListMembershipInLoopAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find ``in`` tests against list
+    literals in loops, which compare against every element in turn.
+    """
+
+    check = "list_membership_in_loop"
+
+    def visit_Compare(self, node):
+        for op, comparator in zip(node.ops, node.comparators):
+            if (isinstance(op, (ast.In, ast.NotIn)) and isinstance(comparator, ast.List)
+                    and all(isinstance(element, ast.Constant) for element in comparator.elts)
+                    and self.in_loop(node)):
+                self.report(
+                    "list_membership_in_loop", node, len(comparator.elts), "low",
+                    f"Membership test against a list literal of {len(comparator.elts)} items inside a loop.",
+                    "Use a set literal instead; Python builds it once as a constant."
+                )
+
+
+@register_rule
+class RegexCompileInLoopAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find ``re.compile`` calls with a
+    constant pattern in loops.
+    """
+
+    check = "regex_compile_in_loop"
+
+    def visit_Call(self, node):
+        if (_dotted_name(node.func) == "re.compile" and node.args
+                and isinstance(node.args[0], ast.Constant) and self.in_loop(node)):
+            pattern = node.args[0].value
+            # Findings are serialized as JSON, which has no bytes
+            self.report(
+                "regex_compile_in_loop", node, pattern if isinstance(pattern, str) else repr(pattern), "low",
+                "Regular expression compiled inside a loop.",
+                "Compile it once, before the loop or as a module-level constant."
+            )
+
+
+@register_rule
+class AttributeLookupInLoopAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find attribute chains such as
+    ``self.items.append`` looked up several times per loop iteration,
+    while nothing they start from is assigned in the loop.
+    """
+
+    check = "attribute_lookup_in_loop"
+
+    def __init__(self, min_lookups=2):
+        super().__init__()
+        self.min_lookups = min_lookups
+        self._inner = set()  # ids of attributes that are part of a chain already seen
+
+    def enter_loop(self, node):
+        return {}, set()  # chain -> [lookups, first node]; names and chains assigned
+
+    def exit_loop(self, node, state):
+        lookups, assigned = state
+        if self.loops:
+            self.loops[-1][2][1].update(assigned)
+        for chain, (count, first) in lookups.items():
+            if count < self.min_lookups:
+                continue
+            parts = chain.split(".")
+            if any(".".join(parts[:i]) in assigned for i in range(1, len(parts))):
+                continue
+            self.report(
+                "attribute_lookup_in_loop", first, chain, "info",
+                f"'{chain}' is looked up {count} times in each iteration of the loop at line {node.lineno}.",
+                "Bind it to a local variable before the loop."
+            )
+
+    def visit_Attribute(self, node):
+        if self._inner and id(node) in self._inner:
+            self._inner.discard(id(node))
+            return
+        if not self.loops:
+            return
+        chain = _dotted_name(node)
+        if chain is None:
+            return
+        value = node.value
+        while isinstance(value, ast.Attribute):
+            self._inner.add(id(value))
+            value = value.value
+        lookups, assigned = self.loops[-1][2]
+        if not isinstance(node.ctx, ast.Load):
+            assigned.add(chain)
+        elif chain.count(".") >= 2 and self.in_loop(node):
+            entry = lookups.get(chain)
+            if entry is None:
+                lookups[chain] = [1, node]
+            else:
+                entry[0] += 1
+
+    def visit_Name(self, node):
+        if self.loops and not isinstance(node.ctx, ast.Load):
+            self.loops[-1][2][1].add(node.id)
+
+
+@register_rule
+class LenInWhileAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find ``len()`` calls in ``while``
+    conditions, which are evaluated again before every iteration.
+    """
+
+    check = "len_in_while"
+
+    def enter_loop(self, node):
+        if not isinstance(node, ast.While):
+            return
+        for child in ast.walk(node.test):
+            if (isinstance(child, ast.Call) and isinstance(child.func, ast.Name)
+                    and child.func.id == "len" and len(child.args) == 1):
+                # ast.unparse needs Python 3.9
+                call = f"len({_dotted_name(child.args[0]) or '...'})"
+                self.report(
+                    "len_in_while", node, call, "info",
+                    f"'{call}' is recomputed before every iteration of the while loop.",
+                    "Test the container itself (while items:) or loop over it with for."
+                )
+                return
+
+
+def _target_names(target):
+    """Return the names bound by the target of a ``for`` loop or comprehension."""
+    return [child.id for child in ast.walk(target) if isinstance(child, ast.Name)]
+
+
+@register_rule
+class NestedScanAnalyzer(LoopRule):
+    """
+    Analyzes Python source code to find quadratic scans: a loop nested
+    in a loop over the same iterable, or ``index``, ``count`` or
+    ``remove`` calls on the list being looped over.
+    """
+
+    check = "nested_scan"
+
+    def enter_loop(self, node):
+        if isinstance(node, ast.While):
+            return ()
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            loops = [(node.iter, node.target)]
+        else:
+            loops = [(generator.iter, generator.target) for generator in node.generators]
+        # Values bound by the enclosing loops change on every iteration
+        bound = set()
+        for loop, _, _ in self.loops:
+            if isinstance(loop, (ast.For, ast.AsyncFor)):
+                bound.update(_target_names(loop.target))
+            elif not isinstance(loop, ast.While):
+                bound.update(name for generator in loop.generators for name in _target_names(generator.target))
+        names = []
+        for iterable, target in loops:
+            name = _dotted_name(iterable)
+            if name is not None and name.split(".")[0] not in bound and (name in names or self._looped_over(name)):
+                self.report(
+                    "nested_scan", iterable, name, "medium",
+                    f"Nested loop over '{name}' inside a loop over the same iterable is quadratic.",
+                    "Index the items in a dict or set in one pass, then look them up."
+                )
+            names.append(name)
+            bound.update(_target_names(target))
+        return names
+
+    def _looped_over(self, name):
+        return any(name in state for _, _, state in self.loops)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in ("index", "count", "remove") and self.loops:
+            name = _dotted_name(func.value)
+            if name is not None and self._looped_over(name) and self.in_loop(node):
+                self.report(
+                    "nested_scan", node, name, "medium",
+                    f"'{name}.{func.attr}()' scans '{name}' on every iteration of a loop over it.",
+                    "Index the items in a dict or set in one pass, then look them up."
+                )
+
+
+# Suggestions for blocklist entries with a well-known async replacement.
+_ASYNC_ALTERNATIVES = {
+    "time.sleep": "Use 'await asyncio.sleep(...)' instead.",
+    "requests.*": "Use an async HTTP client such as aiohttp or httpx.AsyncClient.",
+    "subprocess.run": "Use 'await asyncio.create_subprocess_exec(...)' instead.",
+}
+
+
+@register_rule
+class BlockingCallAnalyzer(Rule):
+    """
+    Analyzes Python source code to find blocking calls made directly in
+    the body of a coroutine, where they stall the whole event loop.
+
+    ``blocklist`` holds dotted names such as ``time.sleep``; an entry
+    ending in ``.*`` matches everything in that module. Calls are
+    resolved through the file's imports, so ``from time import sleep``
+    followed by ``sleep(1)`` matches ``time.sleep``. Code in a nested
+    ``def`` or ``lambda`` is not reported, since it is often run in an
+    executor.
+    """
+
+    check = "blocking_calls"
+
+    def __init__(self, blocklist=()):
+        self.findings = []
+        self.exact = set()
+        self.prefixes = []
+        for entry in blocklist:
+            if entry.endswith(".*"):
+                self.prefixes.append(entry[:-1])
+            else:
+                self.exact.add(entry)
+        self.imports = {}  # local name -> dotted name it was imported as
+        self.coroutines = []  # enclosing function names, None for sync functions
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(blocklist=config.blocking_functions)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.imports[alias.asname] = alias.name
+
+    def visit_ImportFrom(self, node):
+        if node.module and not node.level:
+            for alias in node.names:
+                self.imports[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def visit_AsyncFunctionDef(self, node):
+        self.coroutines.append(node.name)
+
+    def visit_FunctionDef(self, node):
+        self.coroutines.append(None)
+
+    visit_Lambda = visit_FunctionDef
+
+    def leave_FunctionDef(self, node):
+        self.coroutines.pop()
+
+    leave_AsyncFunctionDef = leave_Lambda = leave_FunctionDef
+
+    def _match(self, name):
+        if name in self.exact:
+            return name
+        for prefix in self.prefixes:
+            if name.startswith(prefix):
+                return prefix + "*"
+        return None
+
+    def visit_Call(self, node):
+        if not self.coroutines or self.coroutines[-1] is None:
+            return
+        name = _dotted_name(node.func)
+        if name is None:
+            return
+        head, dot, rest = name.partition(".")
+        if head in self.imports:
+            name = self.imports[head] + dot + rest
+        entry = self._match(name)
+        if entry is not None:
+            coroutine = self.coroutines[-1]
+            self.findings.append(Finding(
+                type="blocking_calls",
+                function_name=coroutine,
+                line_number=node.lineno,
+                value=name,
+                severity="high",
+                message=f"Blocking call '{name}()' in coroutine '{coroutine}' stalls the event loop.",
+                suggestion=_ASYNC_ALTERNATIVES.get(
+                    entry, "Use an async equivalent, or run it with 'await asyncio.to_thread(...)'."
+                )
+            ))
+
+
+@register_rule
+class DuplicateFunctionAnalyzer(Rule):
+    """
+    Analyzes Python source code to find duplicated functions.
+
+    A function is reported when it has the same structure as an earlier
+    function of the file once names and literals are ignored, or when
+    their structural fingerprints are estimated at least ``similarity``
+    alike. Functions smaller than ``min_nodes`` AST nodes are skipped.
+    """
+
+    check = "duplicate_code"
+
+    def __init__(self, min_nodes=50, similarity=0.8):
+        self.min_nodes = min_nodes
+        self.index = DuplicateIndex(similarity)
+        self.findings = []
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(min_nodes=config.duplicate_min_nodes, similarity=config.duplicate_similarity)
+
+    def visit_FunctionDef(self, node):
+        result = fingerprint(node, self.min_nodes)
+        if result is None:
+            return
+        match = self.index.add((node.name, node.lineno), *result)
+        if match is not None:
+            (other_name, other_line), score = match
+            self.findings.append(duplicate_finding(node.name, node.lineno, other_name, other_line, score))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+# From the first '#' on a line, the last TODO-style keyword on that line.
+TODO_PATTERN = re.compile(r'#[^\n]*\b(TODO|FIXME|HACK|XXX|OPTIMIZE)\b', re.IGNORECASE)
 
 
 class TodoCommentAnalyzer:
     """
     Analyzes Python source code to find TODO/FIXME comments.
+
+    The default mode runs one regex scan over the whole buffer, so a
+    ``#`` inside a string literal also counts. With ``accurate=True`` only
+    real comment tokens are considered, at the cost of tokenizing.
     """
 
-    def __init__(self):
+    def __init__(self, accurate=False):
+        self.accurate = accurate
         self.findings = []
 
     def analyze(self, source_code):
         """Analyze source code for TODO/FIXME comments."""
-        lines = source_code.split('\n')
-        todo_pattern = re.compile(r'#.*\b(TODO|FIXME|HACK|XXX|OPTIMIZE)\b', re.IGNORECASE)
-        
-        for line_num, line in enumerate(lines, 1):
-            match = todo_pattern.search(line)
-            if match:
-                keyword = match.group(1).upper()
-                self.findings.append({
-                    "type": "todo_comments",
-                    "function_name": None,
-                    "line_number": line_num,
-                    "value": keyword,
-                    "severity": "info",
-                    "message": f"{keyword} comment found: {line.strip()}",
-                    "suggestion": "Consider addressing this comment or creating a proper issue/task."
-                })
-
-def analyze_complexity(source_code, max_complexity=10):
+        if '#' not in source_code:
+            return
+        self._analyze_buffer(source_code)
+
+        # Every real comment match is also a buffer match, so only files
+        # with candidates need to be tokenized to drop those in strings.
+        if self.accurate and self.findings:
+            candidates = self.findings
+            self.findings = []
+            try:
+                self._analyze_tokens(source_code)
+            except SyntaxError:
+                # tokenize gives up on some sources; keep the fast results
+                self.findings = candidates
+
+    def _analyze_buffer(self, source_code):
+        line_num = 1
+        position = 0
+        for match in TODO_PATTERN.finditer(source_code):
+            start = match.start()
+            line_num += source_code.count('\n', position, start)
+            position = start
+            line_start = source_code.rfind('\n', 0, start) + 1
+            line_end = source_code.find('\n', start)
+            if line_end == -1:
+                line_end = len(source_code)
+            self._add(line_num, match.group(1), source_code[line_start:line_end])
+
+    def _analyze_tokens(self, source_code):
+        import io
+        import tokenize
+
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(source_code).readline):
+                if token.type == tokenize.COMMENT:
+                    match = TODO_PATTERN.match(token.string)
+                    if match:
+                        self._add(token.start[0], match.group(1), token.line)
+        except tokenize.TokenError as e:
+            raise SyntaxError(str(e))
+
+    def _add(self, line_num, keyword, line):
+        keyword = keyword.upper()
+        self.findings.append(Finding(
+            type="todo_comments",
+            function_name=None,
+            line_number=line_num,
+            value=keyword,
+            severity="info",
+            message=f"{keyword} comment found: {line.strip()}",
+            suggestion="Consider addressing this comment or creating a proper issue/task."
+        ))
+
+def analyze_complexity(source_code, max_complexity=10, tree=None):
     """
     Analyzes the given source code for cyclomatic complexity.
+
+    If ``tree`` is given it must be the already-parsed module for
+    ``source_code``, and radon reuses it instead of parsing again.
     """
+    # radon is only loaded once complexity analysis is actually requested
+    from radon.visitors import ComplexityVisitor
+
     findings = []
+    if tree is None:
+        tree = ast.parse(source_code)
     try:
-        visitor = ComplexityVisitor.from_code(source_code)
-        for function in visitor.functions:
-            if function.complexity > max_complexity:
-                findings.append({
-                    "type": "complexity",
-                    "function_name": function.name,
-                    "line_number": function.lineno,
-                    "value": function.complexity,
-                    "severity": "high",
-                    "message": f"Function '{function.name}' has a cyclomatic complexity of {function.complexity}, which is more than the allowed {max_complexity}.",
-                    "suggestion": "Consider breaking this function into smaller functions or simplifying the logic."
-                })
-    except Exception:
-        # Radon can fail on some code, so we ignore errors for now.
-        pass
+        visitor = ComplexityVisitor.from_ast(tree)
+    except Exception as e:
+        findings.append(Finding(
+            type="complexity_error",
+            function_name=None,
+            line_number=None,
+            value=type(e).__name__,
+            severity="info",
+            message=f"Complexity analysis failed: {e}",
+            suggestion="Report this file so the complexity checker can be fixed."
+        ))
+        return findings
+
+    for function in visitor.functions:
+        if function.complexity > max_complexity:
+            findings.append(Finding(
+                type="complexity",
+                function_name=function.name,
+                line_number=function.lineno,
+                value=function.complexity,
+                severity="high",
+                message=f"Function '{function.name}' has a cyclomatic complexity of {function.complexity}, which is more than the allowed {max_complexity}.",
+                suggestion="Consider breaking this function into smaller functions or simplifying the logic."
+            ))
     return findings
 
-def analyze_code(source_code, max_args=5, max_complexity=10, max_lines=50, config=None):
+def _budget_finding(budget, limit, used):
+    descriptions = {
+        "bytes": f"the file is {used} bytes, over the budget of {limit}",
+        "nodes": f"the syntax tree has more than {limit} nodes",
+        "seconds": f"analysis took more than {limit} seconds",
+        "nesting": "the code is too deeply nested to parse",
+    }
+    if budget == "nesting":
+        suggestion = "Exclude the file if it is generated, or break the nested expression up."
+    else:
+        suggestion = "Exclude the file if it is generated, or raise the budget_* limits in the configuration."
+    return Finding(
+        type="budget_exceeded",
+        function_name=None,
+        line_number=None,
+        value={"budget": budget, "limit": limit, "used": used},
+        severity="info",
+        message=f"Analysis budget exceeded: {descriptions[budget]}. Only cheap checks were run.",
+        suggestion=suggestion
+    )
+
+
+def analyze_code(source_code, max_args=5, max_complexity=10, max_lines=50, config=None, timings=None, on_tree=None):
     """
     Analyzes the given source code for various issues and returns a list of findings.
-    """
-    all_findings = []
-
-    # Use config if provided, otherwise use defaults
-    if config:
-        max_args = config.max_args
-        max_complexity = config.max_complexity
-        max_lines = config.max_lines
 
-    # AST-based analysis (argument count, function length)
-    try:
-        tree = ast.parse(source_code)
+    ``source_code`` may be a string or the raw bytes of a file; bytes are
+    parsed directly, honoring a BOM or PEP 263 encoding cookie.
 
-        arg_analyzer = ArgumentCountAnalyzer(max_args=max_args)
-        arg_analyzer.visit(tree)
-        all_findings.extend(arg_analyzer.findings)
+    If the source goes over one of the ``budget_*`` limits of the config,
+    the AST rules that did not finish and the complexity check are
+    dropped, and a ``budget_exceeded`` finding is reported instead.
 
-        length_analyzer = FunctionLengthAnalyzer(max_lines=max_lines)
-        length_analyzer.visit(tree)
-        all_findings.extend(length_analyzer.findings)
+    If ``timings`` is a dict, the seconds spent parsing and in each rule
+    are added to it under ``parse`` and the rule's name. If ``on_tree``
+    is given, it is called with the parsed tree, so callers can reuse
+    the parse.
+    """
+    all_findings = []
 
-        # New analyzers
-        if not config or config.checks.get("unused_imports", True):
-            import_analyzer = UnusedImportAnalyzer()
-            import_analyzer.visit(tree)
-            import_analyzer.finalize()
-            all_findings.extend(import_analyzer.findings)
+    # Use config if provided, otherwise build one from the keyword defaults
+    if config is None:
+        config = Config(max_args=max_args, max_complexity=max_complexity, max_lines=max_lines)
+    max_complexity = config.max_complexity
+    start = time.perf_counter()
+    deadline = start + config.budget_seconds if config.budget_seconds is not None else None
+    over_budget = None
 
-        if not config or config.checks.get("missing_docstrings", True):
-            docstring_analyzer = MissingDocstringAnalyzer()
-            docstring_analyzer.visit(tree)
-            all_findings.extend(docstring_analyzer.findings)
+    # AST-based analysis: every enabled rule shares a single traversal
+    try:
+        if config.budget_bytes is not None and len(source_code) > config.budget_bytes:
+            raise BudgetExceeded("bytes", config.budget_bytes, len(source_code))
+        with timed(timings, "parse"):
+            try:
+                tree = ast.parse(source_code)
+            except (RecursionError, MemoryError):
+                raise BudgetExceeded("nesting")
+        if on_tree is not None:
+            on_tree(tree)
 
-        if not config or config.checks.get("magic_numbers", True):
-            magic_analyzer = MagicNumberAnalyzer()
-            magic_analyzer.visit(tree)
-            all_findings.extend(magic_analyzer.findings)
+        rules = [
+            rule_cls.from_config(config) for rule_cls in RULES
+            if rule_cls.check is None or config.checks.get(rule_cls.check, True)
+        ]
+        run_rules(tree, rules, timings, config.budget_nodes, deadline)
+        for rule in rules:
+            with timed(timings, type(rule).__name__):
+                rule.finalize()
+            all_findings.extend(rule.findings)
 
     except SyntaxError as e:
-        all_findings.append({
-            "type": "syntax_error",
-            "function_name": None,
-            "line_number": e.lineno,
-            "value": None,
-            "severity": "critical",
-            "message": f"Invalid syntax: {e.msg}",
-            "suggestion": "Fix the syntax error before running other analyses."
-        })
+        all_findings.append(Finding(
+            type="syntax_error",
+            function_name=None,
+            line_number=e.lineno,
+            value=None,
+            severity="critical",
+            message=f"Invalid syntax: {e.msg}",
+            suggestion="Fix the syntax error before running other analyses."
+        ))
         # If syntax is invalid, we can't proceed with other analyses
         return all_findings
+    except BudgetExceeded as e:
+        over_budget = e
 
-    # Complexity analysis
-    all_findings.extend(analyze_complexity(source_code, max_complexity))
+    # Complexity analysis, reusing the tree parsed above
+    if over_budget is None and config.checks.get("complexity", True):
+        if deadline is not None and time.perf_counter() > deadline:
+            over_budget = BudgetExceeded("seconds")
+        else:
+            with timed(timings, "analyze_complexity"):
+                all_findings.extend(analyze_complexity(source_code, max_complexity, tree=tree))
+
+    if over_budget is not None:
+        if over_budget.budget == "seconds":
+            over_budget.limit = config.budget_seconds
+            over_budget.used = round(time.perf_counter() - start, 3)
+        all_findings.append(_budget_finding(over_budget.budget, over_budget.limit, over_budget.used))
 
     # TODO comment analysis
-    if not config or config.checks.get("todo_comments", True):
-        todo_analyzer = TodoCommentAnalyzer()
-        todo_analyzer.analyze(source_code)
+    if config.checks.get("todo_comments", True):
+        with timed(timings, "TodoCommentAnalyzer"):
+            if isinstance(source_code, bytes):
+                source_code = decode_source(source_code)
+            todo_analyzer = TodoCommentAnalyzer(accurate=config.accurate_todo_comments)
+            todo_analyzer.analyze(source_code)
         all_findings.extend(todo_analyzer.findings)
 
     # Apply severity levels from config if provided
-    if config and config.severity:
+    if config.severity:
         for finding in all_findings:
-            finding_type = finding["type"]
-            if finding_type in config.severity:
-                finding["severity"] = config.severity[finding_type]
+            if finding.type in config.severity:
+                finding.severity = sys.intern(config.severity[finding.type])
 
     return all_findings
 
-def explain_code(source_code, language="Python"):
+# Files with more lines than this are explained one top-level definition at a time.
+EXPLAIN_CHUNK_LINES = 150
+
+
+def split_for_explanation(source_code, language="Python", max_lines=EXPLAIN_CHUNK_LINES):
+    """
+    Split source code into ``(title, first_line, last_line, text)`` chunks.
+
+    Every top-level function or class, with its decorators and the
+    comments right above it, becomes its own chunk; the code between
+    them is grouped into "module-level code" chunks. Short files, files
+    that are not Python and files that do not parse are a single chunk.
+    """
+    lines = source_code.splitlines(keepends=True)
+    whole = [("the whole file", 1, len(lines), source_code)]
+    if language.lower() != "python" or len(lines) <= max_lines:
+        return whole
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        return whole
+
+    definitions = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            title = f"class {node.name}"
+        elif isinstance(node, ast.AsyncFunctionDef):
+            title = f"async function {node.name}"
+        elif isinstance(node, ast.FunctionDef):
+            title = f"function {node.name}"
+        else:
+            continue
+        first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        floor = definitions[-1][2] + 1 if definitions else 1
+        while first > floor and lines[first - 2].lstrip().startswith("#"):
+            first -= 1
+        definitions.append((title, first, node.end_lineno))
+    if len(definitions) < 2:
+        return whole
+
+    chunks = []
+    line = 1
+    for title, first, last in definitions + [(None, len(lines) + 1, len(lines))]:
+        gap = "".join(lines[line - 1:first - 1])
+        if gap.strip():
+            chunks.append(("module-level code", line, first - 1, gap))
+        if title is not None:
+            chunks.append((title, first, last, "".join(lines[first - 1:last])))
+        line = last + 1
+    return chunks
+
+
+def explanation_prompt(chunk, language="Python", chunked=False):
+    """Build the prompt for one chunk; it holds no line numbers, so moved code stays cached."""
+    title, _, _, text = chunk
+    if not chunked:
+        return f"Explain the following {language} code:\n\n```{language.lower()}\n{text}\n```"
+    return (
+        f"Explain the following {language} code, the {title} of a larger file:"
+        f"\n\n```{language.lower()}\n{text}\n```"
+    )
+
+
+def explain_chunk(chunk, language="Python", chunked=False, cache=None):
+    """Ask the AI to explain one chunk from ``split_for_explanation``."""
+    return get_ai_response(explanation_prompt(chunk, language, chunked), cache=cache)
+
+
+def merge_explanations(chunks, explanations):
+    """Join chunk explanations into one report, in source order."""
+    if len(chunks) == 1:
+        return explanations[0]
+    return "\n\n".join(
+        f"### {title} (lines {first}-{last})\n\n{explanation}"
+        for (title, first, last, _), explanation in zip(chunks, explanations)
+    )
+
+
+def explain_code(source_code, language="Python", cache=None, jobs=4):
     """
     Uses an AI to explain the given source code.
+
+    Large Python files are split along top-level definitions and the
+    chunks are explained concurrently, at most ``jobs`` at a time. With a
+    ``ResponseCache``, each chunk is cached by its content, so after an
+    edit only the changed definitions are sent again.
     """
-    prompt = f"Explain the following {language} code:\n\n```{language.lower()}\n{source_code}\n```"
-    return get_ai_response(prompt)
+    chunks = split_for_explanation(source_code, language)
+    if len(chunks) == 1:
+        return explain_chunk(chunks[0], language, cache=cache)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        explanations = list(executor.map(lambda chunk: explain_chunk(chunk, language, True, cache), chunks))
+    return merge_explanations(chunks, explanations)
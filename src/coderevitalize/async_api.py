@@ -0,0 +1,118 @@
+import asyncio
+import os
+import weakref
+
+from .analyzer import analyze_code
+from .config import Config
+from .reader import SkippedFile, read_source
+
+DEFAULT_CONCURRENCY = os.cpu_count() or 1
+
+
+def _analyze_source(source_code, config):
+    return analyze_code(source_code, config=config)
+
+
+def _analyze_path(path, config):
+    try:
+        data = read_source(path, config.max_file_size, config.skip_generated)
+    except SkippedFile:
+        return []
+    return analyze_code(data, config=config)
+
+
+class AsyncAnalyzer:
+    """
+    Runs analyses in an executor so that callers on an event loop never block.
+
+    By default the work goes to a process pool of ``max_concurrency``
+    workers, created on first use; pass ``executor`` to share an existing
+    process or thread pool instead. At most ``max_concurrency`` analyses
+    run at once, each bounded by ``timeout`` seconds if given.
+
+    The limit is kept per event loop, so one analyzer can serve loops
+    that are started one after the other, as ``asyncio.run`` does.
+
+    A timed-out or cancelled analysis that has not started is dropped. One
+    that is already running in a worker cannot be interrupted, and finishes
+    there in the background; only the caller stops waiting for it.
+    """
+
+    def __init__(self, executor=None, max_concurrency=DEFAULT_CONCURRENCY, timeout=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor = executor
+        self._owns_executor = executor is None
+        # asyncio primitives bind to the first loop that waits on them
+        self._semaphores = weakref.WeakKeyDictionary()  # loop -> Semaphore
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            # multiprocessing is only imported once a pool is really needed
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+        return self._executor
+
+    async def _run(self, func, *args, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            future = loop.run_in_executor(self.executor, func, *args)
+            return await asyncio.wait_for(future, timeout)
+
+    async def analyze_code(self, source_code, config=None, timeout=None):
+        """Return the same findings as ``analyze_code(source_code, config=config)``."""
+        return await self._run(_analyze_source, source_code, config or Config(), timeout=timeout)
+
+    async def analyze_paths(self, paths, config=None, timeout=None, return_exceptions=False):
+        """
+        Analyze files concurrently and return ``{path: findings}`` in input order.
+
+        ``timeout`` applies to each file. As with ``asyncio.gather``, the
+        first error is raised unless ``return_exceptions`` is set, in which
+        case a failed or timed-out file maps to its exception. Files skipped
+        for their size or because they look generated have no findings.
+        """
+        config = config or Config()
+        paths = list(paths)
+        results = await asyncio.gather(
+            *(self._run(_analyze_path, path, config, timeout=timeout) for path in paths),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(paths, results))
+
+    def close(self):
+        """Shut down the executor if this analyzer created it."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+_default_analyzer = None
+
+
+def _get_default_analyzer():
+    global _default_analyzer
+    if _default_analyzer is None:
+        _default_analyzer = AsyncAnalyzer()
+    return _default_analyzer
+
+
+async def analyze_code_async(source_code, config=None, timeout=None):
+    """``analyze_code`` on the shared default ``AsyncAnalyzer``."""
+    return await _get_default_analyzer().analyze_code(source_code, config, timeout)
+
+
+async def analyze_paths_async(paths, config=None, timeout=None, return_exceptions=False):
+    """``AsyncAnalyzer.analyze_paths`` on the shared default ``AsyncAnalyzer``."""
+    return await _get_default_analyzer().analyze_paths(paths, config, timeout, return_exceptions)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from importlib.util import decode_source
+
+BASELINE_FORMAT = 1
+
+
+def _source_lines(filepath):
+    with open(filepath, "rb") as f:
+        return decode_source(f.read()).splitlines()
+
+
+def _context(lines, line_number):
+    """The finding's source line with whitespace normalized, or '' if there is none."""
+    if not line_number or line_number > len(lines):
+        return ""
+    return " ".join(lines[line_number - 1].split())
+
+
+class Baseline:
+    """
+    A multiset of finding fingerprints recorded from an earlier run.
+
+    A fingerprint hashes the file path (relative to the baseline file),
+    the finding type, the function name and the normalized text of the
+    finding's source line, but not its line number, so findings stay
+    matched while code around them moves. ``filter`` drops findings whose
+    fingerprint is still in the baseline, one occurrence each.
+    """
+
+    def __init__(self, root=".", counts=None):
+        self.root = root
+        self.counts = Counter(counts or {})
+        self.suppressed = 0
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Error loading baseline {path}: {e}")
+        if data.get("format") != BASELINE_FORMAT:
+            raise ValueError(f"Baseline {path} has an unsupported format; write it again with --write-baseline.")
+        return cls(os.path.dirname(os.path.abspath(path)), data["fingerprints"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"format": BASELINE_FORMAT, "fingerprints": dict(sorted(self.counts.items()))}, f, indent=0)
+            f.write("\n")
+
+    def fingerprints(self, filepath, findings):
+        """Return the fingerprint of each finding of ``filepath``, in order."""
+        relative_path = os.path.relpath(os.path.abspath(filepath), self.root).replace(os.sep, "/")
+        try:
+            lines = _source_lines(filepath)
+        except (OSError, SyntaxError, ValueError):
+            lines = []
+        result = []
+        for finding in findings:
+            key = "\0".join((
+                relative_path, finding.type, finding.function_name or "",
+                _context(lines, finding.line_number),
+            ))
+            result.append(hashlib.sha1(key.encode("utf-8")).hexdigest()[:16])
+        return result
+
+    def add(self, filepath, findings):
+        """Record ``findings`` of ``filepath`` in the baseline."""
+        if findings:
+            self.counts.update(self.fingerprints(filepath, findings))
+
+    def filter(self, filepath, findings):
+        """Return the findings of ``filepath`` that are not in the baseline."""
+        if not findings or not self.counts:
+            return findings
+        counts = self.counts
+        remaining = []
+        for finding, fingerprint in zip(findings, self.fingerprints(filepath, findings)):
+            if counts[fingerprint] > 0:
+                counts[fingerprint] -= 1
+                self.suppressed += 1
+            else:
+                remaining.append(finding)
+        return remaining
+
+    def __len__(self):
+        return sum(self.counts.values())
@@ -0,0 +1,175 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from . import __version__
+from .finding import Finding
+
+DEFAULT_CACHE_DIR = ".coderevitalize_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+DEFAULT_RESPONSE_CACHE_DIR = ".coderevitalize_ai_cache"
+DEFAULT_RESPONSE_TTL = 7 * 24 * 60 * 60
+DEFAULT_RESPONSE_MAX_BYTES = 16 * 1024 * 1024
+
+# Bumped whenever the on-disk entry layout changes.
+CACHE_FORMAT = 2
+
+# Config fields that decide which files are analyzed, not what is found in them.
+_NON_RESULT_FIELDS = {"include", "exclude"}
+
+
+def config_fingerprint(config):
+    """Hash the parts of ``config`` that affect findings, plus the tool version."""
+    data = {
+        name: value for name, value in dataclasses.asdict(config).items()
+        if name not in _NON_RESULT_FIELDS
+    }
+    payload = json.dumps([__version__, CACHE_FORMAT, data], sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cacheable(findings):
+    """Check whether ``findings`` may be cached; running out of time depends on machine load."""
+    return not any(
+        finding.type == "budget_exceeded" and finding.value["budget"] == "seconds"
+        for finding in findings
+    )
+
+
+class ResultCache:
+    """
+    On-disk cache of per-file findings keyed by content hash.
+
+    Each entry is a small JSON file of finding rows, named after the hash
+    of the file contents and the config fingerprint, so an edited file or
+    a changed config simply misses. Entries are touched on every hit and the least
+    recently used ones are evicted by ``prune`` once the cache grows past
+    ``max_bytes``.
+    """
+
+    def __init__(self, directory, config, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.fingerprint = config_fingerprint(config)
+        self.max_bytes = max_bytes
+
+    def key(self, data):
+        """Return the cache key for the raw bytes of a source file."""
+        digest = hashlib.sha256(self.fingerprint.encode("ascii"))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """Return the cached findings for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                findings = [Finding.from_row(row) for row in json.load(f)]
+            os.utime(path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return findings
+
+    def put(self, key, findings):
+        """Store ``findings`` under ``key``; failures only cost a cache miss."""
+        _write_json(self._path(key), [finding.to_row() for finding in findings])
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in ``max_bytes``."""
+        _prune(self.directory, self.max_bytes)
+
+
+class ResponseCache:
+    """
+    On-disk cache of AI responses keyed by model, prompt and parameters.
+
+    Uses the same layout and LRU eviction as ``ResultCache``; in addition
+    entries older than ``ttl`` seconds are treated as misses and removed.
+    """
+
+    def __init__(self, directory=DEFAULT_RESPONSE_CACHE_DIR, ttl=DEFAULT_RESPONSE_TTL,
+                 max_bytes=DEFAULT_RESPONSE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def key(self, model, prompt, params):
+        """Return the cache key for a request."""
+        payload = json.dumps([model, prompt, params], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """Return the cached response text for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                created, response = json.load(f)
+            if self.ttl is not None and time.time() - created > self.ttl:
+                os.remove(path)
+                return None
+            os.utime(path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return response
+
+    def put(self, key, response):
+        """Store ``response`` under ``key``; failures only cost a cache miss."""
+        _write_json(self._path(key), [time.time(), response])
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in ``max_bytes``."""
+        _prune(self.directory, self.max_bytes)
+
+
+def _write_json(path, data):
+    """Atomically write ``data`` as JSON to ``path``, ignoring failures."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _prune(directory, max_bytes):
+    """Remove the least recently used entries below ``directory`` until it fits in ``max_bytes``."""
+    entries = []
+    total = 0
+    try:
+        shards = list(os.scandir(directory))
+    except OSError:
+        return
+    for shard in shards:
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
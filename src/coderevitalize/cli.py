@@ -1,30 +1,26 @@
 import argparse
 import os
 import sys
-import fnmatch
+from collections import deque
+from itertools import chain, islice
 
-from coderevitalize.analyzer import analyze_code, explain_code
+from coderevitalize.analyzer import analyze_code, explain_chunk, merge_explanations, split_for_explanation
 from coderevitalize.ai import get_ai_response
 from coderevitalize.formatters import get_formatter
 from coderevitalize.config import Config
+from coderevitalize.cache import (
+    DEFAULT_CACHE_DIR, DEFAULT_RESPONSE_CACHE_DIR, DEFAULT_RESPONSE_TTL, ResponseCache, ResultCache, cacheable,
+)
+from coderevitalize import vcs
+from coderevitalize.pathfilter import PathFilter
+from coderevitalize.profiling import Profiler, timed
+from coderevitalize.reader import SkippedFile, read_source
 
 
 def should_include_file(filepath, include_patterns, exclude_patterns):
     """Check if a file should be included based on include/exclude patterns."""
-    filename = os.path.basename(filepath)
-    relative_path = filepath
-    
-    # Check exclude patterns first
-    for pattern in exclude_patterns:
-        if fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(filename, pattern):
-            return False
-    
-    # Check include patterns
-    for pattern in include_patterns:
-        if fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(filename, pattern):
-            return True
-    
-    return False
+    path_filter = PathFilter.for_patterns(tuple(include_patterns), tuple(exclude_patterns))
+    return path_filter.includes(filepath)
 
 
 def main(argv=None):
@@ -34,15 +30,40 @@ def main(argv=None):
     # Analyze command
     parser_analyze = subparsers.add_parser("analyze", help="Analyze Python code for 'aged' or inefficient patterns.")
     parser_analyze.add_argument("path", help="Path to the Python file or directory to analyze.")
-    parser_analyze.add_argument("--max-args", type=int, default=5, help="The maximum number of arguments a function can have. (default: 5)")
-    parser_analyze.add_argument("--max-complexity", type=int, default=10, help="The maximum cyclomatic complexity a function can have. (default: 10)")
-    parser_analyze.add_argument("--max-lines", type=int, default=50, help="The maximum number of lines a function can have. (default: 50)")
-    parser_analyze.add_argument("--format", choices=['text', 'json'], default='text', help="The output format. (default: text)")
+    parser_analyze.add_argument("--max-args", type=int, help="The maximum number of arguments a function can have. (default: 5)")
+    parser_analyze.add_argument("--max-complexity", type=int, help="The maximum cyclomatic complexity a function can have. (default: 10)")
+    parser_analyze.add_argument("--max-lines", type=int, help="The maximum number of lines a function can have. (default: 50)")
+    parser_analyze.add_argument("--format", choices=['text', 'json', 'jsonl'], default='text', help="The output format. (default: text)")
+    parser_analyze.add_argument("--config", help="Path to a configuration file. (default: search upwards from the analyzed path)")
+    parser_analyze.add_argument("--no-color", action="store_true", help="Disable colored output.")
+    parser_analyze.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="The number of worker processes to analyze files with. (default: CPU count)")
+    parser_analyze.add_argument("--no-cache", action="store_true", help="Re-analyze every file instead of reusing cached results.")
+    changed = parser_analyze.add_mutually_exclusive_group()
+    changed.add_argument("--since", metavar="REV", help="Only analyze Python files changed since the given git revision.")
+    changed.add_argument("--staged", action="store_true", help="Only analyze Python files staged in git.")
+    parser_analyze.add_argument("--changed-lines", action="store_true", help="With --since or --staged, only report findings on changed lines.")
+    parser_analyze.add_argument("--profile", action="store_true", help="Report parse and per-rule timings and the slowest files.")
+    parser_analyze.add_argument("--profile-top", type=int, default=10, metavar="N", help="How many of the slowest files and rules to report. (default: 10)")
+    parser_analyze.add_argument("--server", nargs="?", const=True, metavar="SOCKET", help="Send the files to a running 'coderevitalize serve' daemon instead of analyzing them here.")
+    parser_analyze.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Where to keep cached results. (default: {DEFAULT_CACHE_DIR})")
+    parser_analyze.add_argument("--baseline", metavar="FILE", help="Only report findings that are not recorded in this baseline file.")
+    parser_analyze.add_argument("--write-baseline", action="store_true", help="Record all current findings in the --baseline file instead of reporting them.")
+    parser_analyze.add_argument("--watch", action="store_true", help="Keep running and report new and resolved findings as files change.")
+    parser_analyze.add_argument("--poll-interval", type=float, default=1.0, metavar="SECONDS", help="How often to check for changes where inotify is unavailable. (default: 1.0)")
+
+    # Serve command
+    parser_serve = subparsers.add_parser("serve", help="Run a long-lived analysis daemon on a Unix socket.")
+    parser_serve.add_argument("--socket", help="Path of the Unix socket to listen on. (default: a per-user socket in the temp directory)")
+    parser_serve.add_argument("--max-entries", type=int, default=10000, help="How many results to keep in memory. (default: 10000)")
 
     # Explain command
     parser_explain = subparsers.add_parser("explain", help="Explain a piece of code using AI.")
-    parser_explain.add_argument("path", help="Path to the file to explain.")
+    parser_explain.add_argument("paths", nargs="+", metavar="path", help="Path to the file to explain.")
     parser_explain.add_argument("--language", default="Python", help="The programming language of the code.")
+    parser_explain.add_argument("--jobs", "-j", type=int, default=4, help="The number of requests to send at once. (default: 4)")
+    parser_explain.add_argument("--no-cache", action="store_true", help="Always ask the AI instead of reusing earlier responses.")
+    parser_explain.add_argument("--cache-dir", default=DEFAULT_RESPONSE_CACHE_DIR, help=f"Where to keep cached responses. (default: {DEFAULT_RESPONSE_CACHE_DIR})")
+    parser_explain.add_argument("--cache-ttl", type=float, default=DEFAULT_RESPONSE_TTL, metavar="SECONDS", help="How long cached responses stay valid. (default: one week)")
 
     # Write command
     parser_write = subparsers.add_parser("write", help="Write a script from a description using AI.")
@@ -54,70 +75,465 @@ def main(argv=None):
 
     if args.command == "analyze":
         handle_analyze(args)
+    elif args.command == "serve":
+        handle_serve(args)
     elif args.command == "explain":
         handle_explain(args)
     elif args.command == "write":
         handle_write(args)
 
+def load_config(args):
+    """Build the effective configuration for an analyze run."""
+    config_path = args.config or Config.find_config_file(args.path)
+    try:
+        config = Config.from_file(config_path) if config_path else Config()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    return config.update_from_args(args)
+
+
+def discover_files(path, config):
+    """Yield the Python files under ``path`` to analyze, in a stable order."""
+    if os.path.isfile(path):
+        if should_include_file(path, config.include, config.exclude):
+            yield path
+        return
+
+    path_filter = PathFilter.for_patterns(tuple(config.include), tuple(config.exclude))
+    for root, dirs, files in os.walk(path):
+        relative_root = os.path.relpath(root, path)
+        if relative_root == os.curdir:
+            relative_root = ""
+        # Prune excluded directories so os.walk never descends into them
+        dirs[:] = sorted(
+            d for d in dirs
+            if not path_filter.excludes_dir(os.path.join(relative_root, d))
+        )
+        for file in sorted(files):
+            if file.endswith(".py"):
+                relative_path = os.path.join(relative_root, file)
+                if path_filter.includes(relative_path, check_parents=False):
+                    yield os.path.join(root, file)
+
+
+def discover_changed_files(path, config, since=None, staged=False):
+    """Yield the Python files under ``path`` changed in git, in a stable order."""
+    if os.path.isfile(path):
+        if vcs.changed_files(path, since, staged) and should_include_file(path, config.include, config.exclude):
+            yield path
+        return
+
+    root = os.path.realpath(path)
+    for changed_path in vcs.changed_files(path, since, staged):
+        relative_path = os.path.relpath(changed_path, root)
+        if should_include_file(relative_path, config.include, config.exclude):
+            yield os.path.join(path, relative_path)
+
+
+# Number of files sent to a worker process at a time.
+CHUNK_SIZE = 16
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _process_profiled(filepath, config, cache, profile, symbol_path=None):
+    """
+    Return ``(findings, timings, table)``; timings is None unless profiling,
+    and table is the file's symbol table if ``symbol_path``, its path in the
+    project, is given, else None.
+    """
+    timings = {} if profile else None
+    if symbol_path is None:
+        return process_file(filepath, config, cache, timings), timings, None
+
+    from coderevitalize.symbols import read_symbols, symbol_table
+
+    tables = []
+    findings = process_file(filepath, config, cache, timings,
+                            on_tree=lambda tree: tables.append(symbol_table(tree, symbol_path, config)))
+    # Cached or skipped files were not parsed
+    table = tables[0] if tables else read_symbols(filepath, symbol_path, config)
+    return findings, timings, table
+
+
+def _process_chunk(filepaths, config, cache, profile, symbol_paths):
+    return [
+        _process_profiled(filepath, config, cache, profile, symbol_path)
+        for filepath, symbol_path in zip(filepaths, symbol_paths)
+    ]
+
+
+def analyze_files(filepaths, config, jobs=1, cache=None, chunksize=CHUNK_SIZE, profiler=None, symbols=None):
+    """
+    Analyze ``filepaths`` and yield ``(filepath, findings)`` pairs in input order.
+
+    ``filepaths`` may be any iterable and is consumed lazily. With more than
+    one job, files are sent in chunks to a process pool; only a bounded
+    number of chunks is in flight at once, and results are still yielded
+    in the order the files were given.
+
+    If a ``profiler`` is given, its ``record(filepath, timings)`` hook is
+    called in this process for every file before its findings are yielded.
+
+    If a ``symbols`` index is given, the workers also build the symbol
+    tables of the files it has no current table for, from the same parse
+    as the analysis, and they are added to it as results arrive.
+    """
+    profile = profiler is not None
+
+    def submit(chunk):
+        symbol_paths = [symbols.stale(filepath, config) if symbols is not None else None for filepath in chunk]
+        return chunk, config, cache, profile, symbol_paths
+
+    def results(chunk, outcomes):
+        for filepath, (findings, timings, table) in zip(chunk, outcomes):
+            if profile:
+                profiler.record(filepath, timings)
+            if table is not None:
+                symbols.add(filepath, table)
+            yield filepath, findings
+
+    chunks = _chunks(filepaths, chunksize)
+    first = next(chunks, None)
+    if first is None:
+        return
+
+    # A single job, or too few files to fill one chunk, runs inline.
+    if jobs <= 1 or len(first) < chunksize:
+        for chunk in chain([first], chunks):
+            yield from results(chunk, _process_chunk(*submit(chunk)))
+        return
+
+    # multiprocessing is only imported once a pool is really needed
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for chunk in chain([first], chunks):
+            pending.append((chunk, executor.submit(_process_chunk, *submit(chunk))))
+            if len(pending) >= jobs * 2:
+                chunk, future = pending.popleft()
+                yield from results(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from results(chunk, future.result())
+
+
+# Number of files sent to the analysis server per request.
+SERVER_BATCH_SIZE = 256
+
+
+def analyze_files_remote(filepaths, socket_path, config=None, batchsize=SERVER_BATCH_SIZE):
+    """Like ``analyze_files``, but the analysis happens in a running server, with ``config`` if given."""
+    from coderevitalize.server import analyze_remote
+
+    for chunk in _chunks(filepaths, batchsize):
+        results = analyze_remote(socket_path, chunk, config)
+        for filepath in chunk:
+            yield filepath, results.get(filepath, [])
+
+
+def watch_changes(path, config, watcher, jobs=1, cache=None):
+    """
+    Analyze the directory ``path``, then re-analyze files as ``watcher`` reports them.
+
+    Yields ``{filepath: findings}`` for the initial run, then
+    ``{filepath: (introduced, resolved)}`` for every batch of changes that
+    made a difference. Deleted files resolve all their findings.
+    """
+    from coderevitalize.watch import RESCAN, diff_findings
+
+    known = dict(analyze_files(discover_files(path, config), config, jobs, cache))
+    yield dict(known)
+
+    for batch in watcher.batches():
+        if batch is RESCAN:
+            batch = set(discover_files(path, config)) | set(known)
+        existing = sorted(filepath for filepath in batch if os.path.isfile(filepath))
+        current = dict(analyze_files(existing, config, jobs, cache))
+
+        changes = {}
+        for filepath in sorted(batch):
+            findings = current.get(filepath, [])
+            introduced, resolved = diff_findings(known.get(filepath, []), findings)
+            if filepath in current:
+                known[filepath] = findings
+            else:
+                known.pop(filepath, None)
+            if introduced or resolved:
+                changes[filepath] = (introduced, resolved)
+        if changes:
+            yield changes
+
+
+def _disable_colors(args):
+    if args.no_color:
+        from coderevitalize.formatters import TextFormatter
+        TextFormatter.SEVERITY_COLORS = {k: '' for k in TextFormatter.SEVERITY_COLORS}
+        TextFormatter.RESET_COLOR = ''
+
+
+def handle_watch(args, config):
+    from coderevitalize.watch import make_watcher
+
+    if not os.path.isdir(args.path):
+        print("Error: --watch needs a directory.", file=sys.stderr)
+        sys.exit(1)
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir, config)
+    # A single JSON document never ends, so watch mode writes JSON Lines instead.
+    formatter = get_formatter('text' if args.format == 'text' else 'jsonl')
+    watcher = make_watcher(args.path, config, args.poll_interval)
+    updates = watch_changes(args.path, config, watcher, args.jobs, cache)
+    try:
+        formatter.start()
+        for filepath, findings in next(updates).items():
+            if findings:
+                formatter.add_file(filepath, findings)
+        formatter.finish()
+        print(f"Watching {args.path} for changes. Press Ctrl+C to stop.", file=sys.stderr)
+        for changes in updates:
+            formatter.add_changes(changes)
+            if cache is not None:
+                cache.prune()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
 def handle_analyze(args):
     if not os.path.exists(args.path):
         print(f"Error: Path '{args.path}' does not exist.", file=sys.stderr)
         sys.exit(1)
 
-    all_findings = {}
-    files_processed = 0
+    config = load_config(args)
+    if args.watch:
+        if args.since or args.staged or args.server:
+            print("Error: --watch cannot be combined with --since, --staged or --server.", file=sys.stderr)
+            sys.exit(1)
+        _disable_colors(args)
+        handle_watch(args, config)
+        return
+    changed_only = args.since or args.staged
+    if args.changed_lines and not changed_only:
+        print("Error: --changed-lines requires --since or --staged.", file=sys.stderr)
+        sys.exit(1)
+    if args.write_baseline and not args.baseline:
+        print("Error: --write-baseline requires --baseline FILE.", file=sys.stderr)
+        sys.exit(1)
 
-    if os.path.isfile(args.path):
-        if should_include_file(args.path, include_patterns, exclude_patterns):
-            filepath = args.path
-            findings = process_file(filepath, config)
-            if findings:
-                all_findings[filepath] = findings
-            files_processed = 1
+    baseline = None
+    if args.baseline:
+        from coderevitalize.baseline import Baseline
+        if args.write_baseline:
+            baseline = Baseline(os.path.dirname(os.path.abspath(args.baseline)))
+        else:
+            try:
+                baseline = Baseline.load(args.baseline)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+
+    try:
+        if changed_only:
+            filepaths = discover_changed_files(args.path, config, args.since, args.staged)
+            line_ranges = vcs.changed_lines(args.path, args.since, args.staged) if args.changed_lines else None
         else:
+            filepaths = discover_files(args.path, config)
+            line_ranges = None
+        first = next(filepaths, None)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if first is None:
+        if os.path.isfile(args.path) and not changed_only:
             print(f"File '{args.path}' excluded by patterns.", file=sys.stderr)
-            sys.exit(0)
-    elif os.path.isdir(args.path):
-        for root, _, files in os.walk(args.path):
-            for file in files:
-                if file.endswith(".py"):
-                    filepath = os.path.join(root, file)
-                    relative_path = os.path.relpath(filepath, args.path)
-                    
-                    if should_include_file(relative_path, include_patterns, exclude_patterns):
-                        findings = process_file(filepath, config)
-                        if findings:
-                            all_findings[filepath] = findings
-                        files_processed += 1
-
-    if files_processed == 0:
-        print("No Python files found to analyze.", file=sys.stderr)
+        else:
+            print("No Python files found to analyze.", file=sys.stderr)
         sys.exit(0)
 
-    # Disable colors if requested
-    if args.no_color:
-        from coderevitalize.formatters import TextFormatter
-        TextFormatter.SEVERITY_COLORS = {k: '' for k in TextFormatter.SEVERITY_COLORS}
-        TextFormatter.RESET_COLOR = ''
+    cache = None if args.no_cache else ResultCache(args.cache_dir, config)
+
+    _disable_colors(args)
+
+    # Findings are handed to the formatter file by file as they arrive.
+    profiler = Profiler(top=args.profile_top) if args.profile else None
+    filepaths = chain([first], filepaths)
+    if args.server:
+        from coderevitalize.server import DEFAULT_SOCKET
+        socket_path = DEFAULT_SOCKET if args.server is True else args.server
+        results = analyze_files_remote(filepaths, socket_path, config)
+    else:
+        index = None
+        if config.project_analysis and os.path.isdir(args.path):
+            index = open_symbol_index(args.path, None if args.no_cache else args.cache_dir)
+        results = analyze_files(filepaths, config, args.jobs, cache, profiler=profiler, symbols=index)
+        if index is not None:
+            # Only changed files are analyzed, but the index covers the project
+            project_files = discover_files(args.path, config) if changed_only else None
+            results = apply_symbol_index(results, index, config, None if args.no_cache else args.cache_dir,
+                                         project_files)
+
+    if args.write_baseline:
+        write_baseline(results, baseline, args.baseline)
+        if cache is not None:
+            cache.prune()
+        return
 
     formatter = get_formatter(args.format)
-    formatter.display(all_findings)
+    formatter.start()
+    found_issues = False
+    try:
+        for filepath, findings in results:
+            if line_ranges is not None:
+                ranges = line_ranges.get(os.path.realpath(filepath), [])
+                findings = [
+                    finding for finding in findings
+                    if not finding['line_number'] or vcs.in_ranges(finding['line_number'], ranges)
+                ]
+            if baseline is not None:
+                findings = baseline.filter(filepath, findings)
+            if findings:
+                found_issues = True
+                formatter.add_file(filepath, findings)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    formatter.finish(profile=profiler.report() if profiler else None)
 
-    if all_findings:
+    if cache is not None:
+        cache.prune()
+    if baseline is not None and baseline.suppressed:
+        print(f"{baseline.suppressed} findings recorded in the baseline were not reported.", file=sys.stderr)
+
+    if found_issues:
         sys.exit(1)
 
-def handle_explain(args):
-    if not os.path.exists(args.path) or not os.path.isfile(args.path):
-        print(f"Error: Path '{args.path}' is not a valid file.", file=sys.stderr)
+def open_symbol_index(path, cache_dir=None):
+    """Return the project symbol index for the directory ``path``, as saved in ``cache_dir``."""
+    from coderevitalize.symbols import SymbolIndex
+
+    return SymbolIndex.load(path, cache_dir) if cache_dir else SymbolIndex(path)
+
+
+def update_symbol_index(index, filepaths, config, cache_dir=None):
+    """Bring ``index`` up to date with ``filepaths`` and save it in ``cache_dir`` if it changed."""
+    index.update(filepaths, config)
+    if cache_dir and index.reprocessed:
+        index.save(cache_dir)
+
+
+def apply_symbol_index(results, index, config, cache_dir=None, project_files=None):
+    """
+    Yield ``results`` with the cross-module findings of ``index`` added.
+
+    Those depend on every file of the project, so the results are held
+    until the analysis has added all the tables it built to the index;
+    ``project_files`` are the project's files if not all were analyzed.
+    """
+    results = list(results)
+    if project_files is None:
+        project_files = [filepath for filepath, _ in results]
+    update_symbol_index(index, project_files, config, cache_dir)
+    for filepath, findings in results:
+        yield filepath, index.apply(filepath, findings, config)
+
+
+def write_baseline(results, baseline, path):
+    """Record every finding in ``results`` in ``baseline`` and save it to ``path``."""
+    try:
+        for filepath, findings in results:
+            baseline.add(filepath, findings)
+        baseline.save(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    print(f"Wrote {len(baseline)} findings to the baseline {path}.", file=sys.stderr)
+
+
+def handle_serve(args):
+    from coderevitalize.server import DEFAULT_SOCKET, serve
 
+    socket_path = args.socket or DEFAULT_SOCKET
+    print(f"Serving analysis requests on {socket_path}", file=sys.stderr)
     try:
-        with open(args.path, "r", encoding="utf-8") as f:
-            source_code = f.read()
-        explanation = explain_code(source_code, args.language)
-        print(explanation)
-    except Exception as e:
-        print(f"Error explaining file {args.path}: {e}", file=sys.stderr)
+        serve(socket_path, max_entries=args.max_entries)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def explain_files(filepaths, language="Python", jobs=4, cache=None):
+    """
+    Explain ``filepaths`` and yield ``(filepath, explanation, error)`` in input order.
+
+    Large files are split into chunks (see ``split_for_explanation``).
+    The chunks of all files share one pool, so at most ``jobs`` requests
+    are sent at once; ``error`` is the exception raised for a file, in
+    which case ``explanation`` is None.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def submit(filepath):
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                source_code = f.read()
+        except (OSError, ValueError) as e:
+            return filepath, None, e
+        chunks = split_for_explanation(source_code, language)
+        chunked = len(chunks) > 1
+        return filepath, chunks, [
+            executor.submit(explain_chunk, chunk, language, chunked, cache) for chunk in chunks
+        ]
+
+    def result(filepath, chunks, futures):
+        if chunks is None:
+            return filepath, None, futures
+        try:
+            return filepath, merge_explanations(chunks, [future.result() for future in futures]), None
+        except Exception as e:
+            return filepath, None, e
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        pending = deque()
+        for filepath in filepaths:
+            pending.append(submit(filepath))
+            if len(pending) >= jobs * 2:
+                yield result(*pending.popleft())
+        while pending:
+            yield result(*pending.popleft())
+
+
+def handle_explain(args):
+    for path in args.paths:
+        if not os.path.isfile(path):
+            print(f"Error: Path '{path}' is not a valid file.", file=sys.stderr)
+            sys.exit(1)
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.cache_ttl)
+    failed = False
+    for filepath, explanation, error in explain_files(args.paths, args.language, args.jobs, cache):
+        if error is not None:
+            print(f"Error explaining file {filepath}: {error}", file=sys.stderr)
+            failed = True
+        elif len(args.paths) > 1:
+            print(f"--- Explanation of {filepath} ---\n{explanation}\n")
+        else:
+            print(explanation)
+        sys.stdout.flush()
+
+    if cache is not None:
+        cache.prune()
+    if failed:
         sys.exit(1)
 
 def handle_write(args):
@@ -139,12 +555,39 @@ def handle_write(args):
         print(f"Error generating code: {e}", file=sys.stderr)
         sys.exit(1)
 
-def process_file(filepath, max_args, max_complexity, max_lines):
+def process_file(filepath, config, cache=None, timings=None, on_tree=None):
+    """
+    Read and analyze one file, returning its findings.
+
+    Files that are too large, generated or minified are reported on
+    stderr and skipped. If ``timings`` is a dict it is filled with the
+    file's ``total`` time, ``bytes_read``, whether the result was
+    ``cached``, and the parse and per-rule times from ``analyze_code``.
+    ``on_tree`` is passed on to ``analyze_code``.
+    """
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            source_code = f.read()
+        with timed(timings, "total"):
+            try:
+                data = read_source(filepath, config.max_file_size, config.skip_generated)
+            except SkippedFile as e:
+                print(f"Skipping {filepath}: {e}", file=sys.stderr)
+                return []
+            if timings is not None:
+                timings["bytes_read"] = len(data)
+                timings["cached"] = False
+
+            if cache is not None:
+                key = cache.key(data)
+                findings = cache.get(key)
+                if findings is not None:
+                    if timings is not None:
+                        timings["cached"] = True
+                    return findings
 
-        return analyze_code(source_code, config=config)
+            findings = analyze_code(data, config=config, timings=timings, on_tree=on_tree)
+            if cache is not None and cacheable(findings):
+                cache.put(key, findings)
+            return findings
     except Exception as e:
         print(f"Error processing file {filepath}: {e}", file=sys.stderr)
         return []
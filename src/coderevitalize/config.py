@@ -1,7 +1,6 @@
 import os
-import yaml
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 @dataclass
@@ -16,8 +15,51 @@ class Config:
         "unused_imports": True,
         "missing_docstrings": True,
         "magic_numbers": True,
-        "todo_comments": True
+        "todo_comments": True,
+        "complexity": True,
+        "dead_code": True,
+        "duplicate_code": True,
+        "string_concat_in_loop": True,
+        "list_front_in_loop": True,
+        "list_membership_in_loop": True,
+        "regex_compile_in_loop": True,
+        "attribute_lookup_in_loop": True,
+        "len_in_while": True,
+        "nested_scan": True,
+        "blocking_calls": True
     })
+    # Only count TODO/FIXME markers in real comments, not in strings (slower)
+    accurate_todo_comments: bool = False
+    # Files larger than this many bytes are skipped (0 or None: no limit)
+    max_file_size: int = 1024 * 1024
+    # Skip files marked as generated or that look minified
+    skip_generated: bool = True
+    # Index the whole project to report dead code across modules and to
+    # accept imports that other modules use as re-exports
+    project_analysis: bool = False
+    # Functions with at least this many AST nodes are checked for
+    # duplicates; near duplicates are reported from this estimated similarity
+    duplicate_min_nodes: int = 50
+    duplicate_similarity: float = 0.8
+    # Calls reported when made directly in a coroutine; "module.*" matches
+    # every function of the module
+    blocking_functions: List[str] = field(default_factory=lambda: [
+        "time.sleep",
+        "requests.*",
+        "urllib.request.urlopen",
+        "subprocess.run",
+        "subprocess.call",
+        "subprocess.check_call",
+        "subprocess.check_output",
+        "os.system",
+        "open",
+        "input",
+    ])
+    # Per-file analysis budgets (None: no limit). A file over budget gets a
+    # budget_exceeded finding and only the cheap checks.
+    budget_seconds: Optional[float] = None
+    budget_bytes: Optional[int] = None
+    budget_nodes: Optional[int] = None
     severity: Dict[str, str] = field(default_factory=lambda: {
         "argument_count": "high",
         "complexity": "high", 
@@ -25,12 +67,25 @@ class Config:
         "unused_imports": "low",
         "missing_docstrings": "low",
         "magic_numbers": "low",
-        "todo_comments": "info"
+        "todo_comments": "info",
+        "budget_exceeded": "info",
+        "dead_code": "low",
+        "duplicate_code": "medium",
+        "string_concat_in_loop": "medium",
+        "list_front_in_loop": "medium",
+        "list_membership_in_loop": "low",
+        "regex_compile_in_loop": "low",
+        "attribute_lookup_in_loop": "info",
+        "len_in_while": "info",
+        "nested_scan": "medium",
+        "blocking_calls": "high"
     })
 
     @classmethod
     def from_file(cls, config_path: str) -> 'Config':
         """Load configuration from a YAML file."""
+        import yaml
+
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f) or {}
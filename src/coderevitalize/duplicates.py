@@ -0,0 +1,193 @@
+import ast
+import random
+import zlib
+from collections import defaultdict
+
+from .finding import Finding
+
+# MinHash signature length, split into SIGNATURE_BANDS bands for LSH.
+# Functions sharing one band are compared; with 16 bands of 4 rows, pairs
+# 80% similar almost always share one, pairs 50% similar two times in three.
+SIGNATURE_SIZE = 64
+SIGNATURE_BANDS = 16
+
+_MASK = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+_MULTIPLIER = 1000003
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+_TYPE_CODES = {}
+
+
+def _probes(count, seed):
+    # Fixed seed: signatures are persisted in the project index
+    rng = random.Random(seed)
+    return [[rng.randrange(count) for _ in range(4 * count)] for _ in range(count)]
+
+
+# For each signature slot, the slots an empty one borrows from, in order
+_PROBES = _probes(SIGNATURE_SIZE, 20231)
+
+
+def _type_code(node_cls):
+    code = _TYPE_CODES.get(node_cls)
+    if code is None:
+        code = _TYPE_CODES[node_cls] = zlib.crc32(node_cls.__name__.encode("ascii")) + 1
+    return code
+
+
+def _mix(value):
+    # splitmix64 finalizer, spreading structural hashes over 64 bits
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def fingerprint(node, min_nodes=1):
+    """
+    Return the structural fingerprint of the subtree rooted at ``node``.
+
+    Only node types and the order of children are hashed, so renaming
+    identifiers or changing literals keeps the fingerprint. Returns
+    ``(digest, signature)``: ``digest`` is equal for structurally
+    identical subtrees, and ``signature`` is the MinHash of the subtree's
+    shingles, the shapes of every node with its children and
+    grandchildren, used to estimate how similar two subtrees are.
+    Returns None if the subtree has fewer than ``min_nodes`` nodes.
+    """
+    order = []  # (node, children) in pre-order
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        children = list(ast.iter_child_nodes(current))
+        order.append((current, children))
+        stack.extend(children)
+    if len(order) < min_nodes:
+        return None
+
+    # Children come after their parent in ``order``, so walking it
+    # backwards hashes every node after all of its children.
+    full = {}     # id -> hash of the whole subtree
+    shallow = {}  # id -> hash of the node and the types of its children
+    counts = {}   # shingle -> occurrences so far
+    shingles = set()
+    for current, children in reversed(order):
+        code = _type_code(current.__class__)
+        whole = one = two = code
+        for child in children:
+            key = id(child)
+            whole = (whole * _MULTIPLIER + full[key]) & _MASK
+            one = (one * _MULTIPLIER + _type_code(child.__class__)) & _MASK
+            two = (two * _MULTIPLIER + shallow[key]) & _MASK
+        full[id(current)] = whole
+        shallow[id(current)] = one
+        if two != code:
+            # Repeated shapes are kept apart, so shingles form a multiset
+            seen = counts.get(two, 0)
+            counts[two] = seen + 1
+            shingles.add(two + seen * _MULTIPLIER)
+    return full[id(node)], _signature(shingles)
+
+
+def _signature(shingles):
+    """
+    MinHash ``shingles`` with one permutation: each hashed shingle goes
+    to one slot, which keeps the smallest, and empty slots copy the slot
+    their fixed probe sequence reaches first. Equal slots of two
+    signatures then estimate the Jaccard similarity of the sets, at the
+    cost of one hash per shingle instead of one per shingle and slot.
+    """
+    if not shingles:
+        return []
+    slots = [None] * SIGNATURE_SIZE
+    low_bits = SIGNATURE_SIZE - 1
+    for shingle in shingles:
+        value = _mix(shingle)
+        slot = value & low_bits
+        value >>= _BIN_BITS
+        current = slots[slot]
+        if current is None or value < current:
+            slots[slot] = value
+    signature = list(slots)
+    for slot, value in enumerate(slots):
+        if value is None:
+            for probe in _PROBES[slot]:
+                if slots[probe] is not None:
+                    signature[slot] = slots[probe]
+                    break
+            else:
+                signature[slot] = next(value for value in slots if value is not None)
+    return signature
+
+
+def similarity(signature, other):
+    """Estimate the similarity of two fingerprinted subtrees from their signatures."""
+    if not signature or not other:
+        return 0.0
+    return sum(a == b for a, b in zip(signature, other)) / len(signature)
+
+
+class DuplicateIndex:
+    """
+    Finds exact and near duplicates among fingerprinted items.
+
+    Exact duplicates are found through a dict keyed by digest. Near
+    duplicates are found by locality-sensitive hashing: each band of a
+    signature is a bucket key, and a new item is only compared with the
+    earlier items sharing one of its buckets, so the cost grows with the
+    number of items rather than the number of pairs.
+    """
+
+    def __init__(self, threshold=0.8):
+        self.threshold = threshold
+        self.items = []
+        self.signatures = []
+        self.digests = {}  # digest -> position of its first item
+        self.buckets = defaultdict(list)  # (band, rows) -> positions
+
+    def add(self, item, digest, signature):
+        """
+        Index ``item`` and return ``(earlier item, similarity)`` for its
+        closest earlier duplicate, or None if it has none.
+        """
+        position = len(self.items)
+        self.items.append(item)
+        self.signatures.append(signature)
+        first = self.digests.setdefault(digest, position)
+        if first != position:
+            # Its buckets are the same as those of the first copy
+            return self.items[first], 1.0
+
+        rows = SIGNATURE_SIZE // SIGNATURE_BANDS
+        best = None
+        best_similarity = self.threshold
+        seen = set()
+        for band in range(SIGNATURE_BANDS):
+            bucket = self.buckets[band, tuple(signature[band * rows:(band + 1) * rows])]
+            for other in bucket:
+                if other not in seen:
+                    seen.add(other)
+                    score = similarity(signature, self.signatures[other])
+                    if score > best_similarity or (score == best_similarity and (best is None or other < best)):
+                        best, best_similarity = other, score
+            bucket.append(position)
+        if best is None:
+            return None
+        return self.items[best], best_similarity
+
+
+def duplicate_finding(function_name, line_number, other_name, other_line, score, other_file=None, severity="medium"):
+    """Build the ``duplicate_code`` finding of a function duplicating ``other_name``."""
+    where = f"{other_file}:{other_line}" if other_file else f"line {other_line}"
+    if score == 1.0:
+        message = f"Function '{function_name}' duplicates '{other_name}' ({where}) up to names and literals."
+    else:
+        message = f"Function '{function_name}' is {score:.0%} similar to '{other_name}' ({where})."
+    return Finding(
+        type="duplicate_code",
+        function_name=function_name,
+        line_number=line_number,
+        value={"duplicate_of": other_name, "file": other_file, "line": other_line, "similarity": round(score, 2)},
+        severity=severity,
+        message=message,
+        suggestion="Extract the shared logic into one function and call it from both places."
+    )
@@ -0,0 +1,129 @@
+import ast
+import time
+
+# Registered rule classes, in the order their findings are reported.
+RULES = []
+
+
+def register_rule(rule_cls):
+    """Register a rule class with the single-pass engine."""
+    RULES.append(rule_cls)
+    return rule_cls
+
+
+class Rule(ast.NodeVisitor):
+    """
+    Base class for AST rules run by the single-pass engine.
+
+    Rules define ``visit_<NodeType>`` handlers like a regular
+    ``ast.NodeVisitor``, but handlers must not recurse: the engine walks
+    the tree once and hands every node to each interested rule. Rules
+    that track nesting, such as scopes, can also define
+    ``leave_<NodeType>`` handlers, called once the node's whole subtree
+    has been visited.
+    """
+
+    # Name of the entry in ``Config.checks`` toggling this rule, or None
+    # if the rule is always enabled.
+    check = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the rule from the effective configuration."""
+        return cls()
+
+    def visit(self, node):
+        run_rules(node, [self])
+
+    def finalize(self):
+        """Called once after the whole tree has been visited."""
+
+
+class BudgetExceeded(Exception):
+    """Raised when a file goes over one of its analysis budgets."""
+
+    def __init__(self, budget, limit=None, used=None):
+        super().__init__(f"{budget} budget exceeded")
+        self.budget = budget
+        self.limit = limit
+        self.used = used
+
+
+# How many nodes are visited between two deadline checks.
+_DEADLINE_INTERVAL = 1024
+
+
+def _timed_handler(handler, timings, key):
+    clock = time.perf_counter
+
+    def timed(node):
+        start = clock()
+        handler(node)
+        timings[key] = timings.get(key, 0.0) + clock() - start
+    return timed
+
+
+class _Leave:
+    """Stack marker that runs the ``leave_`` handlers of ``node``."""
+
+    __slots__ = ("node", "handlers")
+
+    def __init__(self, node, handlers):
+        self.node = node
+        self.handlers = handlers
+
+
+def _handlers_for(node_cls, rules, timings=None, prefix='visit_'):
+    name = prefix + node_cls.__name__
+    base = getattr(ast.NodeVisitor, name, None)
+    handlers = []
+    for rule in rules:
+        if getattr(type(rule), name, base) is base:
+            continue
+        handler = getattr(rule, name)
+        if timings is not None:
+            handler = _timed_handler(handler, timings, type(rule).__name__)
+        handlers.append(handler)
+    return handlers
+
+
+def run_rules(tree, rules, timings=None, max_nodes=None, deadline=None):
+    """
+    Walk ``tree`` once in the same pre-order as ``ast.NodeVisitor`` and
+    dispatch each node to the matching handlers of every rule, and to
+    their ``leave_`` handlers after the node's subtree.
+
+    If ``timings`` is a dict, the time spent in each rule's handlers is
+    added to ``timings[<rule class name>]``. ``BudgetExceeded`` is raised
+    once more than ``max_nodes`` nodes have been visited, or when the
+    ``time.perf_counter()`` value ``deadline`` has passed.
+    """
+    dispatch = {}
+    leave_dispatch = {}
+    stack = [tree]
+    limit = max_nodes if max_nodes is not None else float("inf")
+    visited = 0
+    while stack:
+        node = stack.pop()
+        node_cls = node.__class__
+        if node_cls is _Leave:
+            for handler in node.handlers:
+                handler(node.node)
+            continue
+        visited += 1
+        if visited > limit:
+            raise BudgetExceeded("nodes", max_nodes, visited)
+        if deadline is not None and visited % _DEADLINE_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise BudgetExceeded("seconds")
+        handlers = dispatch.get(node_cls)
+        if handlers is None:
+            handlers = dispatch[node_cls] = _handlers_for(node_cls, rules, timings)
+            leave_dispatch[node_cls] = _handlers_for(node_cls, rules, timings, 'leave_')
+        for handler in handlers:
+            handler(node)
+        leave_handlers = leave_dispatch[node_cls]
+        if leave_handlers:
+            stack.append(_Leave(node, leave_handlers))
+        children = list(ast.iter_child_nodes(node))
+        children.reverse()
+        stack.extend(children)
@@ -0,0 +1,72 @@
+import sys
+
+
+class Finding:
+    """
+    A single issue reported by an analyzer.
+
+    Findings are compact slotted records: the ``type``, ``severity`` and
+    ``suggestion`` strings are interned so thousands of findings share
+    one copy of each. For backward compatibility a finding can also be
+    read like the dict analyzers used to return (``finding['type']``,
+    ``finding.get('severity')``), and ``to_dict`` returns that dict.
+    """
+
+    FIELDS = ("type", "function_name", "line_number", "value", "severity", "message", "suggestion")
+    __slots__ = FIELDS
+
+    def __init__(self, type, function_name, line_number, value, severity, message, suggestion=None):
+        self.type = sys.intern(type)
+        self.function_name = function_name
+        self.line_number = line_number
+        self.value = value
+        self.severity = sys.intern(severity)
+        self.message = message
+        self.suggestion = sys.intern(suggestion) if suggestion is not None else None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.FIELDS})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def to_row(self):
+        """Return the field values as a list, the most compact serialized form."""
+        return [getattr(self, name) for name in self.FIELDS]
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def __eq__(self, other):
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __repr__(self):
+        return f"Finding({', '.join(f'{name}={getattr(self, name)!r}' for name in self.FIELDS)})"
+
+
+def as_dict(finding):
+    """Return a plain dict for a Finding or an already dict-shaped finding."""
+    return finding.to_dict() if isinstance(finding, Finding) else finding
@@ -1,11 +1,58 @@
 import json
+import sys
 from collections import defaultdict
 
+from .finding import as_dict
+
 
 class BaseFormatter:
-    def display(self, findings_by_file):
+    """
+    Formatters receive findings one file at a time through ``start``,
+    ``add_file`` and ``finish``, so output can be written while analysis
+    is still running. ``display`` formats a complete mapping in one call.
+    ``finish`` optionally receives a ``Profiler.report()`` to include.
+    In watch mode, ``add_changes`` reports what a batch of edits changed.
+    """
+
+    def __init__(self):
+        self.severity_stats = defaultdict(int)
+        self.type_stats = defaultdict(int)
+        self.files_reported = 0
+
+    def start(self):
+        pass
+
+    def add_file(self, filepath, findings):
+        raise NotImplementedError
+
+    def finish(self, profile=None):
+        pass
+
+    def add_changes(self, changes):
+        """Report ``{filepath: (introduced, resolved)}`` for one batch of edits."""
         raise NotImplementedError
 
+    def display(self, findings_by_file):
+        self.start()
+        for filepath, findings in findings_by_file.items():
+            self.add_file(filepath, findings)
+        self.finish()
+
+    def _count(self, findings):
+        """Update the running summary counters with one file's findings."""
+        self.files_reported += 1
+        for finding in findings:
+            self.severity_stats[finding.get('severity', 'info')] += 1
+            self.type_stats[finding.get('type', 'unknown')] += 1
+
+    def _summary(self):
+        return {
+            "total_issues": sum(self.severity_stats.values()),
+            "by_severity": dict(self.severity_stats),
+            "by_type": dict(self.type_stats),
+            "files_analyzed": self.files_reported
+        }
+
 
 class TextFormatter(BaseFormatter):
     SEVERITY_COLORS = {
@@ -17,83 +64,154 @@ class TextFormatter(BaseFormatter):
     }
     RESET_COLOR = '\033[0m'
 
-    def display(self, findings_by_file):
-        total_stats = defaultdict(int)
-        
-        for filepath, findings in findings_by_file.items():
-            if findings:
-                print(f"--- Findings in {filepath} ---")
-                
-                # Sort findings by severity and line number
-                severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'info': 4}
-                sorted_findings = sorted(findings, key=lambda x: (
-                    severity_order.get(x.get('severity', 'info'), 4),
-                    x.get('line_number', 0)
-                ))
-                
-                for finding in sorted_findings:
-                    severity = finding.get('severity', 'info')
-                    total_stats[severity] += 1
-                    
-                    color = self.SEVERITY_COLORS.get(severity, '')
-                    severity_label = f"[{severity.upper()}]"
-                    
-                    if finding['line_number']:
-                        print(f"  Line {finding['line_number']}: {color}{severity_label}{self.RESET_COLOR} {finding['message']}")
-                    else:
-                        print(f"  {color}{severity_label}{self.RESET_COLOR} {finding['message']}")
-                        
-                    # Show suggestion if available
-                    if finding.get('suggestion'):
-                        print(f"    💡 Suggestion: {finding['suggestion']}")
-                        
-                print("-" * (len(filepath) + 18))
-        
+    def add_file(self, filepath, findings):
+        self._count(findings)
+        if not findings:
+            return
+
+        print(f"--- Findings in {filepath} ---")
+
+        # Sort findings by severity and line number
+        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'info': 4}
+        sorted_findings = sorted(findings, key=lambda x: (
+            severity_order.get(x.get('severity', 'info'), 4),
+            x.get('line_number') or 0
+        ))
+
+        for finding in sorted_findings:
+            severity = finding.get('severity', 'info')
+
+            color = self.SEVERITY_COLORS.get(severity, '')
+            severity_label = f"[{severity.upper()}]"
+
+            if finding['line_number']:
+                print(f"  Line {finding['line_number']}: {color}{severity_label}{self.RESET_COLOR} {finding['message']}")
+            else:
+                print(f"  {color}{severity_label}{self.RESET_COLOR} {finding['message']}")
+
+            # Show suggestion if available
+            if finding.get('suggestion'):
+                print(f"    💡 Suggestion: {finding['suggestion']}")
+
+        print("-" * (len(filepath) + 18))
+        sys.stdout.flush()
+
+    def finish(self, profile=None):
         # Display summary
-        if total_stats:
-            total_issues = sum(total_stats.values())
+        total_issues = sum(self.severity_stats.values())
+        if total_issues:
             summary_parts = []
             for severity in ['critical', 'high', 'medium', 'low', 'info']:
-                if total_stats[severity] > 0:
+                if self.severity_stats[severity] > 0:
                     color = self.SEVERITY_COLORS.get(severity, '')
-                    summary_parts.append(f"{total_stats[severity]} {color}{severity}{self.RESET_COLOR}")
-            
+                    summary_parts.append(f"{self.severity_stats[severity]} {color}{severity}{self.RESET_COLOR}")
+
             print(f"\nSummary: {total_issues} issues found ({', '.join(summary_parts)} severity)")
 
+        if profile:
+            self._display_profile(profile)
+
+    def add_changes(self, changes):
+        introduced = sum(len(new) for new, _ in changes.values())
+        resolved = sum(len(gone) for _, gone in changes.values())
+        print(f"--- {len(changes)} files changed: {introduced} new, {resolved} resolved ---")
+        for filepath, (new, gone) in changes.items():
+            for marker, findings in (('+', new), ('-', gone)):
+                for finding in findings:
+                    severity = finding.get('severity', 'info')
+                    color = self.SEVERITY_COLORS.get(severity, '')
+                    print(
+                        f"  {marker} {filepath}:{finding['line_number'] or 0} "
+                        f"{color}[{severity.upper()}]{self.RESET_COLOR} {finding['message']}"
+                    )
+        sys.stdout.flush()
+
+    def _display_profile(self, profile):
+        print(
+            f"\nProfile: {profile['files_profiled']} files in {profile['total_seconds']:.3f}s "
+            f"(parse {profile['parse_seconds']:.3f}s, {profile['bytes_read']} bytes read, "
+            f"{profile['cache_hits']} cached)"
+        )
+        if profile['slowest_rules']:
+            print("  Slowest rules:")
+            for entry in profile['slowest_rules']:
+                print(f"    {entry['seconds']:8.3f}s  {entry['rule']}")
+        if profile['slowest_files']:
+            print("  Slowest files:")
+            for entry in profile['slowest_files']:
+                print(f"    {entry['seconds']:8.3f}s  {entry['file']} ({entry['bytes_read']} bytes)")
+
 
 class JsonFormatter(BaseFormatter):
-    def display(self, findings_by_file):
-        # Add summary statistics to JSON output
-        output = {
-            "files": findings_by_file,
-            "summary": self._generate_summary(findings_by_file)
-        }
-        print(json.dumps(output, indent=2))
-    
+    """
+    Writes one JSON document with a ``files`` mapping and a ``summary``.
+
+    The document is streamed file by file but is byte-for-byte what
+    ``json.dumps(..., indent=2)`` of the whole mapping would produce.
+    """
+
+    def start(self):
+        sys.stdout.write('{\n  "files": {')
+
+    def add_file(self, filepath, findings):
+        separator = ',' if self.files_reported else ''
+        self._count(findings)
+        body = json.dumps([as_dict(f) for f in findings], indent=2).replace('\n', '\n    ')
+        sys.stdout.write(f'{separator}\n    {json.dumps(filepath)}: {body}')
+        sys.stdout.flush()
+
+    def finish(self, profile=None):
+        closing = '\n  }' if self.files_reported else '}'
+        summary = json.dumps(self._summary(), indent=2).replace('\n', '\n  ')
+        sys.stdout.write(f'{closing},\n  "summary": {summary}')
+        if profile:
+            profile = json.dumps(profile, indent=2).replace('\n', '\n  ')
+            sys.stdout.write(f',\n  "profile": {profile}')
+        sys.stdout.write('\n}\n')
+
     def _generate_summary(self, findings_by_file):
         """Generate summary statistics."""
-        total_stats = defaultdict(int)
-        type_stats = defaultdict(int)
-        
+        counter = BaseFormatter()
         for findings in findings_by_file.values():
-            for finding in findings:
-                severity = finding.get('severity', 'info')
-                finding_type = finding.get('type', 'unknown')
-                total_stats[severity] += 1
-                type_stats[finding_type] += 1
-        
-        return {
-            "total_issues": sum(total_stats.values()),
-            "by_severity": dict(total_stats),
-            "by_type": dict(type_stats),
-            "files_analyzed": len(findings_by_file)
-        }
+            counter._count(findings)
+        return counter._summary()
+
+
+class JsonLinesFormatter(BaseFormatter):
+    """
+    Writes one JSON object per line: a ``{"file": ..., "findings": [...]}``
+    record per file as soon as it is analyzed, then a ``{"summary": ...}``
+    record and, when profiling, a ``{"profile": ...}`` record. In watch
+    mode, each changed file gets a ``{"file", "new", "resolved"}`` record.
+    """
+
+    def add_file(self, filepath, findings):
+        self._count(findings)
+        sys.stdout.write(json.dumps({"file": filepath, "findings": [as_dict(f) for f in findings]}) + '\n')
+        sys.stdout.flush()
+
+    def finish(self, profile=None):
+        sys.stdout.write(json.dumps({"summary": self._summary()}) + '\n')
+        if profile:
+            sys.stdout.write(json.dumps({"profile": profile}) + '\n')
+
+    def add_changes(self, changes):
+        for filepath, (new, gone) in changes.items():
+            sys.stdout.write(json.dumps({
+                "file": filepath,
+                "new": [as_dict(f) for f in new],
+                "resolved": [as_dict(f) for f in gone],
+            }) + '\n')
+        sys.stdout.flush()
+
 
 def get_formatter(format_name):
     if format_name == 'text':
         return TextFormatter()
     elif format_name == 'json':
         return JsonFormatter()
+    elif format_name == 'jsonl':
+        return JsonLinesFormatter()
     else:
         # This should be caught by argparse choices, but as a fallback:
         raise ValueError(f"Unknown format: {format_name}")
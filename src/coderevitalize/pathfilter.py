@@ -0,0 +1,75 @@
+import fnmatch
+import os
+import re
+from functools import lru_cache
+
+
+def _compile(patterns):
+    """Combine glob patterns into one regex, or None if there are none."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns))
+
+
+def _matches(regex, *names):
+    return regex is not None and any(regex.match(name) for name in names)
+
+
+class PathFilter:
+    """
+    Include/exclude glob patterns compiled into single regexes.
+
+    A file path (relative to the analyzed root) is excluded if it or its
+    basename matches an exclude pattern, and included if it or its
+    basename matches an include pattern, exactly like ``fnmatch``.
+
+    Directories can be skipped without descending into them: an exclude
+    pattern ending in ``/*`` prunes directories matching the part before
+    it, and a pattern ending in ``/`` (e.g. ``.venv/``) prunes every
+    directory whose path or name matches it.
+    """
+
+    def __init__(self, include, exclude):
+        file_excludes = [p for p in exclude if not p.endswith("/")]
+        dir_names = [p.rstrip("/") for p in exclude if p.endswith("/")]
+        dir_prefixes = [p[:-2] for p in file_excludes if p.endswith("/*") and len(p) > 2]
+
+        self._include = _compile(include)
+        self._exclude = _compile(file_excludes)
+        self._dir_name = _compile(dir_names)
+        self._dir_path = _compile(dir_names + dir_prefixes)
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def for_patterns(cls, include, exclude):
+        """Return a shared filter for the given pattern tuples."""
+        return cls(include, exclude)
+
+    def excludes_dir(self, relative_dir):
+        """Check whether everything below ``relative_dir`` is excluded."""
+        relative_dir = os.path.normcase(relative_dir)
+        return (
+            _matches(self._dir_path, relative_dir)
+            or _matches(self._dir_name, os.path.basename(relative_dir))
+        )
+
+    def includes(self, relative_path, check_parents=True):
+        """
+        Check whether the file at ``relative_path`` should be analyzed.
+
+        ``check_parents`` can be turned off when the caller has already
+        pruned excluded directories, e.g. while walking the tree.
+        """
+        relative_path = os.path.normcase(relative_path)
+        filename = os.path.basename(relative_path)
+        if _matches(self._exclude, relative_path, filename):
+            return False
+
+        if check_parents and self._dir_path is not None:
+            parent = os.path.dirname(relative_path)
+            while parent and parent != os.path.dirname(parent):
+                if self.excludes_dir(parent):
+                    return False
+                parent = os.path.dirname(parent)
+
+        return _matches(self._include, relative_path, filename)
@@ -0,0 +1,86 @@
+import heapq
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Keys of a per-file timings dict that are not rule timings.
+FILE_KEYS = ("total", "parse", "bytes_read", "cached")
+
+
+@contextmanager
+def timed(timings, name):
+    """Add the wall time of the block to ``timings[name]`` if ``timings`` is a dict."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+class Profiler:
+    """
+    Collects per-file timings and reports the slowest files and rules.
+
+    ``record`` is the hook called once per analyzed file with the timings
+    dict filled in by ``analyze_code``/``process_file``: ``total``,
+    ``parse`` and one entry per rule in seconds, plus ``bytes_read`` and
+    ``cached``. Only running totals and the ``top`` slowest files are
+    kept, so memory does not grow with the number of files.
+    """
+
+    def __init__(self, top=10):
+        self.top = top
+        self.files_profiled = 0
+        self.cache_hits = 0
+        self.bytes_read = 0
+        self.total_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.rule_seconds = defaultdict(float)
+        self._slowest = []  # min-heap of (seconds, sequence, filepath, timings)
+
+    def record(self, filepath, timings):
+        self.files_profiled += 1
+        self.cache_hits += bool(timings.get("cached"))
+        self.bytes_read += timings.get("bytes_read", 0)
+        self.total_seconds += timings.get("total", 0.0)
+        self.parse_seconds += timings.get("parse", 0.0)
+        for name, seconds in timings.items():
+            if name not in FILE_KEYS:
+                self.rule_seconds[name] += seconds
+
+        entry = (timings.get("total", 0.0), self.files_profiled, filepath, timings)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_files(self):
+        return [
+            {
+                "file": filepath,
+                "seconds": seconds,
+                "parse_seconds": timings.get("parse", 0.0),
+                "bytes_read": timings.get("bytes_read", 0),
+                "cached": bool(timings.get("cached")),
+            }
+            for seconds, _, filepath, timings in sorted(self._slowest, reverse=True)
+        ]
+
+    def slowest_rules(self):
+        ranked = sorted(self.rule_seconds.items(), key=lambda item: item[1], reverse=True)
+        return [{"rule": name, "seconds": seconds} for name, seconds in ranked[:self.top]]
+
+    def report(self):
+        """Return the profile as a JSON-serializable dict."""
+        return {
+            "files_profiled": self.files_profiled,
+            "cache_hits": self.cache_hits,
+            "bytes_read": self.bytes_read,
+            "total_seconds": self.total_seconds,
+            "parse_seconds": self.parse_seconds,
+            "slowest_rules": self.slowest_rules(),
+            "slowest_files": self.slowest_files(),
+        }
@@ -0,0 +1,63 @@
+import mmap
+import os
+import re
+
+# Files at least this large are memory-mapped, so a generated or minified
+# one is rejected after looking at its first pages only.
+MMAP_THRESHOLD = 256 * 1024
+# How much of a file the generated/minified checks look at.
+HEADER_BYTES = 2048
+SAMPLE_BYTES = 64 * 1024
+# Average line length (in bytes) above which a file is considered minified.
+MINIFIED_LINE_LENGTH = 300
+
+GENERATED_MARKER = re.compile(
+    rb'^#.*(@generated|do not edit|auto-?generated|automatically generated)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+class SkippedFile(Exception):
+    """Raised by ``read_source`` for a file that should not be analyzed."""
+
+
+def skip_reason(data):
+    """Return why ``data`` looks generated or minified, or None."""
+    if GENERATED_MARKER.search(data[:HEADER_BYTES]):
+        return "marked as generated"
+    sample = data[:SAMPLE_BYTES]
+    if len(sample) >= HEADER_BYTES and len(sample) / (sample.count(b"\n") + 1) > MINIFIED_LINE_LENGTH:
+        return "looks minified"
+    return None
+
+
+def read_source(path, max_bytes=None, skip_generated=True):
+    """
+    Return the raw bytes of the source file at ``path``.
+
+    Bytes are returned undecoded so that ``ast.parse`` can honor a BOM or
+    PEP 263 encoding cookie itself. Raises ``SkippedFile`` without reading
+    the file if it is larger than ``max_bytes``, or after reading only its
+    first pages if ``skip_generated`` is set and it looks generated or
+    minified.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_bytes and size > max_bytes:
+            raise SkippedFile(f"{size} bytes is over the max_file_size of {max_bytes}")
+        if size < MMAP_THRESHOLD:
+            data = f.read()
+            view = data
+        else:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            data = None
+
+    try:
+        if skip_generated:
+            reason = skip_reason(view)
+            if reason:
+                raise SkippedFile(reason)
+        return data if data is not None else view[:]
+    finally:
+        if data is None:
+            view.close()
@@ -0,0 +1,247 @@
+import dataclasses
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .analyzer import analyze_code
+from .cache import cacheable, config_fingerprint
+from .config import Config
+from .finding import Finding
+from .reader import SkippedFile, read_source
+
+DEFAULT_SOCKET = os.path.join(
+    tempfile.gettempdir(), f"coderevitalize-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock"
+)
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class AnalysisService:
+    """
+    Analyzes files and buffers, remembering results in memory.
+
+    File results are looked up by (path, mtime, size) first, so an
+    unchanged file is answered without even being read. Every result is
+    also kept by content hash and config fingerprint, so a buffer or a
+    touched-but-identical file is not re-analyzed either. Both maps are
+    LRU-bounded to ``max_entries``.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._by_stat = OrderedDict()     # (path, mtime_ns, size, fingerprint) -> content key
+        self._by_content = OrderedDict()  # content key -> findings
+        self._configs = {}                # (config path, mtime_ns) or sent config -> (Config, fingerprint)
+        self._lock = threading.Lock()
+
+    def _config_for(self, path):
+        config_path = Config.find_config_file(path)
+        if config_path is None:
+            key = None
+        else:
+            key = (config_path, os.stat(config_path).st_mtime_ns)
+        with self._lock:
+            cached = self._configs.get(key)
+        if cached is None:
+            config = Config.from_file(config_path) if config_path else Config()
+            cached = (config, config_fingerprint(config))
+            with self._lock:
+                self._configs[key] = cached
+        return cached
+
+    def _sent_config(self, data):
+        """Return ``(Config, fingerprint)`` for a config sent with a request."""
+        key = json.dumps(data, sort_keys=True)
+        with self._lock:
+            cached = self._configs.get(key)
+        if cached is None:
+            try:
+                config = Config(**data)
+            except TypeError as e:
+                raise ValueError(f"Invalid config: {e}")
+            cached = (config, config_fingerprint(config))
+            with self._lock:
+                self._configs[key] = cached
+        return cached
+
+    def _remember(self, mapping, key, value):
+        mapping[key] = value
+        mapping.move_to_end(key)
+        while len(mapping) > self.max_entries:
+            mapping.popitem(last=False)
+
+    def _analyze(self, data, config, fingerprint, source=None):
+        """Return ``(content key, findings)`` for raw source bytes, or their decoded ``source``."""
+        digest = hashlib.sha256(fingerprint.encode("ascii"))
+        digest.update(data)
+        content_key = digest.hexdigest()
+        with self._lock:
+            findings = self._by_content.get(content_key)
+            if findings is not None:
+                self._by_content.move_to_end(content_key)
+                self.hits += 1
+                return content_key, findings
+            self.misses += 1
+
+        findings = analyze_code(data if source is None else source, config=config)
+        if cacheable(findings):
+            with self._lock:
+                self._remember(self._by_content, content_key, findings)
+        return content_key, findings
+
+    def analyze_file(self, path, config=None):
+        """Analyze a file with ``config``, a ``(Config, fingerprint)`` pair, or the file's own config."""
+        path = os.path.abspath(path)
+        config, fingerprint = config or self._config_for(path)
+        stat = os.stat(path)
+        stat_key = (path, stat.st_mtime_ns, stat.st_size, fingerprint)
+        with self._lock:
+            content_key = self._by_stat.get(stat_key)
+            findings = self._by_content.get(content_key) if content_key else None
+            if findings is not None:
+                self._by_stat.move_to_end(stat_key)
+                self._by_content.move_to_end(content_key)
+                self.hits += 1
+                return findings
+
+        data = read_source(path, config.max_file_size, config.skip_generated)
+        content_key, findings = self._analyze(data, config, fingerprint)
+        with self._lock:
+            self._remember(self._by_stat, stat_key, content_key)
+        return findings
+
+    def analyze_source(self, source, path=None, config=None):
+        """Analyze an editor buffer; ``path`` only selects the config file if no ``config`` is given."""
+        config, fingerprint = config or self._config_for(path or os.getcwd())
+        return self._analyze(source.encode("utf-8"), config, fingerprint, source)[1]
+
+    def handle(self, request):
+        """Answer one decoded request with a JSON-serializable response."""
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True}
+        if command == "stats":
+            with self._lock:
+                return {"ok": True, "hits": self.hits, "misses": self.misses, "entries": len(self._by_content)}
+        if command == "analyze":
+            # Clients send their effective config; otherwise each file's own applies
+            config = self._sent_config(request["config"]) if request.get("config") is not None else None
+            files = {}
+            errors = {}
+            if "source" in request:
+                findings = self.analyze_source(request["source"], request.get("path"), config)
+                files[request.get("path") or "<buffer>"] = [f.to_dict() for f in findings]
+            for path in request.get("paths", []):
+                try:
+                    files[path] = [f.to_dict() for f in self.analyze_file(path, config)]
+                except (OSError, SkippedFile, ValueError) as e:
+                    errors[path] = str(e)
+            return {"ok": True, "files": files, "errors": errors}
+        return {"ok": False, "error": f"Unknown command: {command!r}"}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line, answered by one JSON response line.
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("command") == "shutdown":
+                    response = {"ok": True}
+                    # shutdown() waits for serve_forever, so it can't run on this thread
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    response = self.server.service.handle(request)
+            except (ValueError, AttributeError) as e:
+                response = {"ok": False, "error": f"Bad request: {e}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class AnalysisServer(socketserver.ThreadingUnixStreamServer):
+        """Serves an ``AnalysisService`` over a Unix domain socket."""
+
+        daemon_threads = True
+
+        def __init__(self, socket_path=DEFAULT_SOCKET, service=None):
+            self.socket_path = socket_path
+            self.service = service or AnalysisService()
+            _remove_stale_socket(socket_path)
+            super().__init__(socket_path, _RequestHandler)
+
+        def server_close(self):
+            super().server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+else:  # pragma: no cover - platforms without AF_UNIX
+    AnalysisServer = None
+
+
+def _remove_stale_socket(socket_path):
+    """Remove a socket file left behind by a daemon that is no longer running."""
+    if not os.path.exists(socket_path):
+        return
+    try:
+        request(socket_path, {"command": "ping"})
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise OSError(f"A server is already listening on {socket_path}")
+
+
+def request(socket_path, payload):
+    """Send one request to a running server and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+    if not line:
+        raise OSError(f"No response from server at {socket_path}")
+    return json.loads(line)
+
+
+def analyze_remote(socket_path, paths, config=None):
+    """
+    Analyze ``paths`` on a running server and return ``{path: [Finding, ...]}``.
+
+    With ``config``, the server analyzes with it instead of the config
+    files it finds itself. Files the server could not process are
+    reported on stderr and left out.
+    """
+    # The server has its own working directory, so always send absolute paths.
+    absolute = {os.path.abspath(path): path for path in paths}
+    payload = {"command": "analyze", "paths": list(absolute)}
+    if config is not None:
+        payload["config"] = dataclasses.asdict(config)
+    response = request(socket_path, payload)
+    if not response.get("ok"):
+        raise ValueError(response.get("error", "Server error"))
+    for path, error in response.get("errors", {}).items():
+        print(f"Error processing file {absolute[path]}: {error}", file=sys.stderr)
+    return {
+        absolute[path]: [Finding.from_dict(data) for data in findings]
+        for path, findings in response["files"].items()
+    }
+
+
+def serve(socket_path=DEFAULT_SOCKET, max_entries=DEFAULT_MAX_ENTRIES):
+    """Run the analysis server until interrupted."""
+    if AnalysisServer is None:
+        raise OSError("The analysis server needs Unix domain socket support.")
+    with AnalysisServer(socket_path, AnalysisService(max_entries)) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,327 @@
+import ast
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import defaultdict
+
+from . import __version__
+from .duplicates import DuplicateIndex, duplicate_finding, fingerprint
+from .finding import Finding
+from .reader import SkippedFile, read_source
+
+INDEX_FORMAT = 3
+
+# Top-level names that are used from outside the project's own code.
+_ENTRY_POINTS = {"main", "setup", "teardown", "setup_module", "teardown_module"}
+
+
+def module_name(relative_path):
+    """Return the dotted module name for a path relative to the project root."""
+    parts = relative_path[:-len(".py")].replace(os.sep, "/").split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _resolve(module, level, current, is_package):
+    """Resolve a possibly relative ``from`` import to an absolute module name."""
+    if not level:
+        return module or ""
+    package = current.split(".") if current else []
+    if not is_package:
+        package = package[:-1]
+    if level > 1:
+        package = package[:len(package) - (level - 1)]
+    return ".".join(package + ([module] if module else []))
+
+
+def _string_list(node):
+    if isinstance(node, (ast.List, ast.Tuple)) and all(
+        isinstance(elt, ast.Constant) and isinstance(elt.value, str) for elt in node.elts
+    ):
+        return [elt.value for elt in node.elts]
+    return None
+
+
+def extract_symbols(tree, module, is_package=False, min_nodes=None):
+    """
+    Build the symbol table of one parsed module.
+
+    Returns a JSON-serializable dict with the module's undecorated
+    top-level ``defs``, its ``imports`` as ``[local name, module, name,
+    line]`` (name is None for ``import x``), its literal ``__all__``, the
+    sorted ``names`` it references as variables or attributes, and the
+    ``functions`` of at least ``min_nodes`` AST nodes as ``[name, line,
+    digest, signature]`` (none if ``min_nodes`` is None).
+    """
+    defs = []
+    exports = None
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if not node.decorator_list:
+                defs.append([node.name, node.lineno])
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets
+        ):
+            exports = _string_list(node.value)
+
+    imports = []
+    names = set()
+    functions = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if not isinstance(node.ctx, ast.Store):
+                names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append([alias.asname or alias.name.split(".")[0], alias.name, None, node.lineno])
+        elif isinstance(node, ast.ImportFrom):
+            source = _resolve(node.module, node.level, module, is_package)
+            for alias in node.names:
+                imports.append([alias.asname or alias.name, source, alias.name, node.lineno])
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and min_nodes is not None:
+            result = fingerprint(node, min_nodes)
+            if result is not None:
+                functions.append([node.name, node.lineno, *result])
+    functions.sort(key=lambda function: function[1])
+    return {"module": module, "defs": defs, "imports": imports, "all": exports, "names": sorted(names),
+            "functions": functions}
+
+
+def _min_nodes(config):
+    return config.duplicate_min_nodes if config.checks.get("duplicate_code", True) else None
+
+
+def _stat_key(filepath):
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def symbol_table(tree, relative_path, config):
+    """Build the symbol table of the parsed file at ``relative_path`` within the project."""
+    return extract_symbols(tree, module_name(relative_path), relative_path.endswith("__init__.py"), _min_nodes(config))
+
+
+def read_symbols(filepath, relative_path, config):
+    """Read and parse ``filepath`` and return its symbol table, empty if it cannot be parsed."""
+    try:
+        tree = ast.parse(read_source(filepath, config.max_file_size, config.skip_generated))
+    except (OSError, SkippedFile, SyntaxError, ValueError, RecursionError, MemoryError):
+        return {"module": module_name(relative_path), "defs": [], "imports": [], "all": None, "names": [],
+                "functions": []}
+    return symbol_table(tree, relative_path, config)
+
+
+class SymbolIndex:
+    """
+    Project-wide index of module symbols, used for cross-module checks.
+
+    Only files whose size or modification time changed since the index
+    was saved need a new table: the analysis workers build those from the
+    tree they already parsed and pass them to ``add``, and ``update``
+    reads any that are still missing and forgets files that are gone.
+    ``save`` persists the per-file tables. The merged lookups are
+    rebuilt in one linear pass whenever the tables change.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.files = {}  # relative path -> {"stat": [mtime_ns, size], **symbol table}
+        self.duplicate_min_nodes = None  # fingerprint size the tables were built with
+        self.reprocessed = 0
+        self._pending = {}  # relative path -> stat key, for tables being built
+        self._merged = None
+        self._duplicates = None
+
+    def _path(self, directory):
+        # One index per project root, so alternating between projects keeps both
+        digest = hashlib.sha256(self.root.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(directory, f"symbols-{digest}.json")
+
+    @classmethod
+    def load(cls, root, directory):
+        index = cls(root)
+        try:
+            with open(index._path(directory), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("format") == INDEX_FORMAT and data.get("version") == __version__ and data.get("root") == index.root:
+            index.files = data["files"]
+            index.duplicate_min_nodes = data.get("duplicate_min_nodes")
+        return index
+
+    def save(self, directory):
+        """Write the index to ``directory``; failures only cost a rebuild next time."""
+        data = {"format": INDEX_FORMAT, "version": __version__, "root": self.root,
+                "duplicate_min_nodes": self.duplicate_min_nodes, "files": self.files}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path(directory))
+        except OSError:
+            pass
+
+    def _relative(self, filepath):
+        return os.path.relpath(os.path.abspath(filepath), self.root)
+
+    def _configure(self, config):
+        min_nodes = _min_nodes(config)
+        if min_nodes != self.duplicate_min_nodes:
+            # Fingerprints were taken with other settings
+            self.files = {}
+            self.duplicate_min_nodes = min_nodes
+            self._merged = None
+            self._duplicates = None
+
+    def stale(self, filepath, config):
+        """
+        Return the path of ``filepath`` relative to the root if its table
+        must be rebuilt and handed to ``add``, or None if it is current.
+        """
+        self._configure(config)
+        relative_path = self._relative(filepath)
+        entry = self.files.get(relative_path)
+        key = _stat_key(filepath)
+        if key is None or (entry is not None and entry["stat"] == key):
+            return None
+        self._pending[relative_path] = key
+        return relative_path
+
+    def add(self, filepath, table):
+        """Store the symbol table built for ``filepath`` after ``stale`` asked for it."""
+        relative_path = self._relative(filepath)
+        key = self._pending.pop(relative_path, None) or _stat_key(filepath)
+        if key is None:
+            return
+        self.files[relative_path] = dict(table, stat=key)
+        self.reprocessed += 1
+        self._merged = None
+        self._duplicates = None
+
+    def update(self, filepaths, config):
+        """
+        Bring the index up to date with ``filepaths``, the project's Python
+        files, reading those whose tables were not added by the workers.
+        """
+        self._configure(config)
+        seen = {}
+        for filepath in filepaths:
+            relative_path = self.stale(filepath, config)
+            if relative_path is not None:
+                self.add(filepath, read_symbols(filepath, relative_path, config))
+            else:
+                relative_path = self._relative(filepath)
+            entry = self.files.get(relative_path)
+            if entry is not None:
+                seen[relative_path] = entry
+        if seen.keys() != self.files.keys():
+            self._merged = None
+            self._duplicates = None
+        self.files = seen
+
+    def _merge(self):
+        if self._merged is None:
+            used = set()
+            imported_from = defaultdict(set)  # name -> modules it is imported from
+            for entry in self.files.values():
+                used.update(entry["names"])
+                for _, source, name, _ in entry["imports"]:
+                    if name is not None:
+                        used.add(name)
+                        imported_from[name].add(source)
+            self._merged = (used, imported_from)
+        return self._merged
+
+    def is_reexported(self, filepath, name):
+        """Check whether the import of ``name`` in ``filepath`` is used by other modules."""
+        entry = self.files.get(self._relative(filepath))
+        if entry is None:
+            return False
+        if entry["all"] is not None and name in entry["all"]:
+            return True
+        used, imported_from = self._merge()
+        module = entry["module"]
+        # Either name may carry extra leading packages, such as "src." in a src layout
+        if any(source == module or source.endswith("." + module) or module.endswith("." + source)
+               for source in imported_from.get(name, ())):
+            return True
+        # "import pkg; pkg.name" reaches names imported in pkg/__init__.py
+        return filepath.endswith("__init__.py") and name in used
+
+    def dead_code(self, filepath, severity="low"):
+        """Return ``dead_code`` findings for top-level definitions of ``filepath`` used nowhere."""
+        entry = self.files.get(self._relative(filepath))
+        if entry is None:
+            return []
+        used, _ = self._merge()
+        exports = entry["all"] or ()
+        test_module = os.path.basename(filepath).startswith("test")
+        findings = []
+        for name, line_number in entry["defs"]:
+            if (name in used or name in exports or name in _ENTRY_POINTS
+                    or (name.startswith("__") and name.endswith("__"))
+                    or (test_module and name.lower().startswith("test"))):
+                continue
+            findings.append(Finding(
+                type="dead_code",
+                function_name=name,
+                line_number=line_number,
+                value=name,
+                severity=sys.intern(severity),
+                message=f"'{name}' is defined but never used anywhere in the project.",
+                suggestion="Remove it, or add it to __all__ if it is part of the public API."
+            ))
+        return findings
+
+    def _match_duplicates(self, threshold):
+        if self._duplicates is None or self._duplicates[0] != threshold:
+            index = DuplicateIndex(threshold)
+            matches = defaultdict(list)  # relative path -> [(name, line, (match, similarity)), ...]
+            for relative_path in sorted(self.files):
+                for name, line_number, digest, signature in self.files[relative_path]["functions"]:
+                    match = index.add((relative_path, name, line_number), digest, signature)
+                    # Duplicates within a file are reported by the analyzer itself
+                    if match is not None and match[0][0] != relative_path:
+                        matches[relative_path].append((name, line_number, match))
+            self._duplicates = (threshold, matches)
+        return self._duplicates[1]
+
+    def duplicates(self, filepath, threshold=0.8, severity="medium"):
+        """Return ``duplicate_code`` findings for functions of ``filepath`` that copy a function of another file."""
+        findings = []
+        for name, line_number, ((other_path, other_name, other_line), score) in \
+                self._match_duplicates(threshold).get(self._relative(filepath), ()):
+            findings.append(duplicate_finding(
+                name, line_number, other_name, other_line, score, other_path, sys.intern(severity)
+            ))
+        return findings
+
+    def apply(self, filepath, findings, config):
+        """
+        Drop unused-import findings for re-exported names and add
+        dead-code and cross-module duplicate findings.
+        """
+        findings = [
+            finding for finding in findings
+            if finding.type != "unused_imports" or not self.is_reexported(filepath, finding.value)
+        ]
+        if config.checks.get("dead_code", True):
+            findings.extend(self.dead_code(filepath, config.severity.get("dead_code", "low")))
+        if config.checks.get("duplicate_code", True):
+            reported = {finding.line_number for finding in findings if finding.type == "duplicate_code"}
+            findings.extend(
+                finding for finding in self.duplicates(
+                    filepath, config.duplicate_similarity, config.severity.get("duplicate_code", "medium"))
+                if finding.line_number not in reported
+            )
+        return findings
@@ -0,0 +1,88 @@
+import os
+import re
+import subprocess
+
+_HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def _git(cwd, *args):
+    """Run a git command in ``cwd`` and return its stdout."""
+    try:
+        result = subprocess.run(
+            ["git", "-c", "core.quotepath=off", "-C", cwd] + list(args),
+            capture_output=True, text=True, check=False,
+        )
+    except OSError as e:
+        raise ValueError(f"Could not run git: {e}")
+    if result.returncode != 0:
+        raise ValueError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+# Pin the parts of the diff output that user config can change
+_DIFF_OPTIONS = ["--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/"]
+
+
+def _diff_args(since=None, staged=False):
+    if staged:
+        return ["diff", *_DIFF_OPTIONS, "--cached"]
+    if since:
+        return ["diff", *_DIFF_OPTIONS, since]
+    raise ValueError("Either a revision or staged=True is required.")
+
+
+def _git_cwd(path):
+    path = os.path.realpath(path)
+    return path if os.path.isdir(path) else os.path.dirname(path)
+
+
+def changed_files(path, since=None, staged=False):
+    """
+    Return real paths of the existing Python files under ``path`` that
+    differ from ``since`` (working tree vs. revision) or that are staged.
+    """
+    cwd = _git_cwd(path)
+    toplevel = os.path.realpath(_git(cwd, "rev-parse", "--show-toplevel").strip())
+    output = _git(cwd, *_diff_args(since, staged), "--name-only", "-z", "--diff-filter=ACMR")
+
+    root = os.path.realpath(path)
+    files = []
+    for name in output.split("\0"):
+        if not name.endswith(".py"):
+            continue
+        filepath = os.path.join(toplevel, name)
+        if (filepath == root or filepath.startswith(os.path.join(root, ""))) and os.path.isfile(filepath):
+            files.append(filepath)
+    return sorted(files)
+
+
+def changed_lines(path, since=None, staged=False):
+    """
+    Return ``{real_path: [(first_line, last_line), ...]}`` for the
+    lines added or modified in each changed Python file under ``path``.
+    """
+    cwd = _git_cwd(path)
+    toplevel = os.path.realpath(_git(cwd, "rev-parse", "--show-toplevel").strip())
+    output = _git(cwd, *_diff_args(since, staged), "--unified=0", "--diff-filter=ACMR", "--", ".")
+
+    ranges = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith("+++ "):
+            name = line[4:]
+            current = None
+            if name.startswith("b/") and name.endswith(".py"):
+                current = ranges.setdefault(os.path.join(toplevel, name[2:]), [])
+        elif current is not None:
+            match = _HUNK_RE.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                if count:
+                    current.append((start, start + count - 1))
+    return ranges
+
+
+def in_ranges(line_number, ranges):
+    """Check whether ``line_number`` falls inside any of ``ranges``."""
+    return any(first <= line_number <= last for first, last in ranges)
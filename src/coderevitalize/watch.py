@@ -0,0 +1,226 @@
+import os
+import select
+import struct
+import sys
+import time
+from collections import Counter
+
+from .pathfilter import PathFilter
+
+# Returned by a watcher when it lost track of events and everything must be rechecked.
+RESCAN = object()
+
+
+class Watcher:
+    """
+    Base class for file watchers.
+
+    Subclasses implement ``_read_events(timeout)``, returning the set of
+    changed paths seen within ``timeout`` seconds (None blocks until
+    something happens). ``batches`` turns that into debounced batches so
+    a save storm, such as a branch checkout, is handled in one go.
+    """
+
+    def __init__(self, root, config):
+        self.root = root
+        self.path_filter = PathFilter.for_patterns(tuple(config.include), tuple(config.exclude))
+
+    def _read_events(self, timeout):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def wanted(self, path):
+        """Check whether a changed path is a Python file that should be analyzed."""
+        if not path.endswith(".py"):
+            return False
+        return self.path_filter.includes(os.path.relpath(path, self.root))
+
+    def batches(self, debounce=0.2, max_wait=2.0):
+        """
+        Yield sets of changed paths, or RESCAN.
+
+        After the first event, keep collecting until nothing new arrives for
+        ``debounce`` seconds, but never wait longer than ``max_wait``.
+        """
+        while True:
+            changed = self._read_events(None)
+            deadline = time.monotonic() + max_wait
+            while changed is not RESCAN:
+                remaining = min(debounce, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                more = self._read_events(remaining)
+                if more is RESCAN:
+                    changed = RESCAN
+                elif more:
+                    changed |= more
+                else:
+                    break
+            if changed is RESCAN:
+                yield RESCAN
+            else:
+                changed = {path for path in changed if self.wanted(path)}
+                if changed:
+                    yield changed
+
+
+class PollingWatcher(Watcher):
+    """Detects changes by comparing file mtimes and sizes every ``interval`` seconds."""
+
+    def __init__(self, root, config, interval=1.0):
+        super().__init__(root, config)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for dirpath, dirs, files in os.walk(self.root):
+            relative_root = os.path.relpath(dirpath, self.root)
+            if relative_root == os.curdir:
+                relative_root = ""
+            dirs[:] = [
+                d for d in dirs
+                if not self.path_filter.excludes_dir(os.path.join(relative_root, d))
+            ]
+            for name in files:
+                if name.endswith(".py"):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _read_events(self, timeout):
+        while True:
+            time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or timeout is not None:
+                return changed
+
+
+class InotifyWatcher(Watcher):
+    """Linux inotify watcher; every non-excluded directory gets its own watch."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root, config):
+        super().__init__(root, config)
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> directory
+        self._add_tree(root)
+
+    def _add_dir(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def _add_tree(self, top):
+        """Watch ``top`` and its subdirectories; return the Python files found in it."""
+        found = set()
+        for dirpath, dirs, files in os.walk(top):
+            relative = os.path.relpath(dirpath, self.root)
+            if relative != os.curdir and self.path_filter.excludes_dir(relative):
+                dirs[:] = []
+                continue
+            self._add_dir(dirpath)
+            found.update(os.path.join(dirpath, name) for name in files if name.endswith(".py"))
+        return found
+
+    def _read_events(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            name = data[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b"\0")
+            offset += self._EVENT.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return RESCAN
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                # A directory created or moved in: watch it and pick up its files
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed |= self._add_tree(path)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher(root, config, interval=1.0):
+    """Return an inotify watcher where available, otherwise a polling one."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, config)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, config, interval)
+
+
+def _finding_key(finding):
+    # Line numbers are left out so that findings which merely moved are not reported.
+    return (finding['type'], finding['function_name'], finding['message'])
+
+
+def diff_findings(old, new):
+    """
+    Compare two finding lists for one file.
+
+    Returns ``(introduced, resolved)``: the findings in ``new`` that were
+    not in ``old``, and those in ``old`` that are gone from ``new``.
+    """
+    old_keys = Counter(_finding_key(f) for f in old)
+    new_keys = Counter(_finding_key(f) for f in new)
+    added = new_keys - old_keys
+    removed = old_keys - new_keys
+
+    introduced = []
+    for finding in new:
+        key = _finding_key(finding)
+        if added[key]:
+            added[key] -= 1
+            introduced.append(finding)
+    resolved = []
+    for finding in old:
+        key = _finding_key(finding)
+        if removed[key]:
+            removed[key] -= 1
+            resolved.append(finding)
+    return introduced, resolved
@@ -1,10 +1,136 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from io import StringIO
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from coderevitalize.ai import get_ai_response, get_client
+from coderevitalize.cache import ResponseCache
 from coderevitalize.cli import main
 
+
+class StubCompletionHandler(BaseHTTPRequestHandler):
+    """Answers chat completion requests by echoing the user prompt."""
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(server.delay)
+        payload = json.dumps({
+            "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "Echo: " + body["messages"][-1]["content"]},
+            }],
+        }).encode("utf-8")
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAIClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubCompletionHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = self.server.in_flight = self.server.max_in_flight = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        environ = {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        }
+        self.env = patch.dict(os.environ, environ)
+        self.env.start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def test_client_is_reused(self):
+        self.assertEqual(get_ai_response("first"), "Echo: first")
+        self.assertEqual(get_ai_response("second"), "Echo: second")
+        self.assertIs(get_client("test-key"), get_client("test-key"))
+        self.assertEqual(self.server.requests, 2)
+
+    def test_responses_are_cached(self):
+        cache = ResponseCache(os.path.join(self.tmpdir.name, "cache"))
+        self.assertEqual(get_ai_response("hello", cache=cache), "Echo: hello")
+        self.assertEqual(get_ai_response("hello", cache=cache), "Echo: hello")
+        self.assertEqual(self.server.requests, 1)
+
+        get_ai_response("hello", temperature=0.0, cache=cache)
+        self.assertEqual(self.server.requests, 2)
+
+        expired = ResponseCache(cache.directory, ttl=-1)
+        self.assertEqual(get_ai_response("hello", cache=expired), "Echo: hello")
+        self.assertEqual(self.server.requests, 3)
+
+    def test_explain_many_files_concurrently(self):
+        self.server.delay = 0.1
+        paths = []
+        for index in range(6):
+            path = os.path.join(self.tmpdir.name, f"mod_{index}.py")
+            with open(path, "w") as f:
+                f.write(f"print('module {index}')\n")
+            paths.append(path)
+        argv = ["explain", *paths, "-j", "2", "--cache-dir", os.path.join(self.tmpdir.name, "cache")]
+
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            main(argv)
+        output = stdout.getvalue()
+        positions = [output.index(f"module {index}") for index in range(6)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn(f"--- Explanation of {paths[0]} ---", output)
+        self.assertEqual(self.server.requests, 6)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            main(argv)
+        self.assertEqual(stdout.getvalue(), output)
+        self.assertEqual(self.server.requests, 6)
+
+    def test_large_files_are_explained_in_cached_chunks(self):
+        functions = [f"def func_{i}():\n" + "    x = 1\n" * 40 for i in range(5)]
+        path = os.path.join(self.tmpdir.name, "big.py")
+        argv = ["explain", path, "--cache-dir", os.path.join(self.tmpdir.name, "cache")]
+
+        with open(path, "w") as f:
+            f.write("\n".join(functions))
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            main(argv)
+        report = stdout.getvalue()
+        self.assertEqual(self.server.requests, 5)
+        headings = [report.index(f"### function func_{i} (lines") for i in range(5)]
+        self.assertEqual(headings, sorted(headings))
+
+        # Editing one function, and shifting the ones below it, re-sends only that function
+        functions[2] = "def func_2():\n    return 2\n"
+        with open(path, "w") as f:
+            f.write("\n".join(functions))
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            main(argv)
+        self.assertEqual(self.server.requests, 6)
+        self.assertIn("return 2", stdout.getvalue())
+
+
 class TestAICommands(unittest.TestCase):
     @patch('coderevitalize.analyzer.get_ai_response')
     @patch('sys.stdout', new_callable=StringIO)
@@ -1,9 +1,13 @@
+import ast
 import unittest
 import sys
 import os
+from unittest.mock import patch
 
-from coderevitalize.analyzer import analyze_code
+from coderevitalize.analyzer import analyze_code, analyze_complexity, split_for_explanation, ArgumentCountAnalyzer, MagicNumberAnalyzer, TodoCommentAnalyzer
 from coderevitalize.config import Config
+from coderevitalize.engine import run_rules
+from coderevitalize.finding import Finding
 
 class TestAnalyzer(unittest.TestCase):
 
@@ -151,6 +155,263 @@ def use_os():
         self.assertIn('sys', unused_names)
         self.assertIn('unused_module', unused_names)
 
+    def unused_imports(self, code):
+        config = self.get_basic_config()
+        config.checks["unused_imports"] = True
+        findings = analyze_code(code, config=config)
+        return [(f.line_number, f.value) for f in findings if f.type == 'unused_imports']
+
+    def test_unused_imports_respect_scopes(self):
+        code = '''
+import os
+import json
+import re
+import typing
+
+def shadowed(json):
+    return json
+
+def pattern(flags=re.IGNORECASE) -> typing.Any:
+    os = "local"
+    return os
+
+class Holder:
+    import sys
+    def method(self):
+        return sys.path
+'''
+        self.assertEqual(self.unused_imports(code), [(2, 'os'), (3, 'json'), (15, 'sys')])
+
+    def test_unused_imports_deleted_or_declared_global(self):
+        code = '''
+try:
+    import zlib
+    del zlib
+except ImportError:
+    pass
+
+xmlrpclib = None
+
+def client():
+    global xmlrpclib
+    import xmlrpc.client as xmlrpclib
+
+def server():
+    return xmlrpclib.ServerProxy
+
+def counter():
+    json = None
+    def load():
+        nonlocal json
+        import json
+    load()
+    return json
+
+def unused():
+    global sys
+    import sys
+'''
+        self.assertEqual(self.unused_imports(code), [(27, 'sys')])
+
+    def test_unused_imports_rebound_in_class_body(self):
+        code = '''
+import os
+import logging
+import json
+
+class Settings:
+    os = os
+    logging = logging.getLogger(__name__)
+
+class Shadowing:
+    json = None
+'''
+        self.assertEqual(self.unused_imports(code), [(4, 'json')])
+
+    def test_unused_imports_late_binding_and_comprehensions(self):
+        code = '''
+import os
+
+def later():
+    return [path for path in os.listdir(".")]
+
+import sys
+names = [sys for sys in range(3)]
+'''
+        self.assertEqual(self.unused_imports(code), [(7, 'sys')])
+
+    def test_unused_imports_dotted_duplicates_and_all(self):
+        code = '''
+import os.path
+import os
+import xml.dom
+from . import exported
+from .other import hidden as alias
+from __future__ import annotations
+from shutil import *
+
+__all__ = ["exported"]
+os.getcwd()
+'''
+        self.assertEqual(self.unused_imports(code), [(4, 'xml.dom'), (6, 'alias')])
+
+    def test_duplicate_functions(self):
+        template = '''
+def {name}({path}):
+    {result} = []
+    with open({path}) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("{comment}"):
+                continue
+            name, _, email = line.partition(",")
+            if "@" not in email:
+                raise ValueError(f"bad email for {{name}}")
+            {result}.append({{"name": name, "email": email{extra}}})
+    return {result}
+'''
+        code = (template.format(name="load_users", path="path", result="users", comment="#", extra="")
+                + template.format(name="load_groups", path="filename", result="groups", comment=";", extra="")
+                + template.format(name="load_admins", path="path", result="admins", comment="#", extra=', "admin": True')
+                + "def small(a):\n    return a\n\ndef other(a):\n    return a\n")
+        config = self.get_basic_config()
+        findings = [f for f in analyze_code(code, config=config) if f.type == 'duplicate_code']
+        self.assertEqual([(f.function_name, f.value["duplicate_of"]) for f in findings],
+                         [('load_groups', 'load_users'), ('load_admins', 'load_users')])
+        self.assertEqual(findings[0].value["similarity"], 1.0)
+        self.assertLess(findings[1].value["similarity"], 1.0)
+        self.assertEqual(findings[0].severity, 'medium')
+
+        config.checks["duplicate_code"] = False
+        self.assertEqual([f for f in analyze_code(code, config=config) if f.type == 'duplicate_code'], [])
+
+    def loop_findings(self, code, config=None):
+        loop_checks = ("string_concat_in_loop", "list_front_in_loop", "list_membership_in_loop",
+                       "regex_compile_in_loop", "attribute_lookup_in_loop", "len_in_while", "nested_scan")
+        findings = analyze_code(code, config=config or self.get_basic_config())
+        return [(f.line_number, f.type) for f in findings if f.type in loop_checks]
+
+    def test_loop_antipatterns(self):
+        code = '''
+import re
+
+def build(rows, items):
+    out = ""
+    for row in rows:
+        out += row
+        items.insert(0, row)
+        if row in ["a", "b"]:
+            pattern = re.compile("x+")
+        for other in rows:
+            pass
+        while len(items) > 3:
+            self.store.data.append(items.pop(0))
+            self.store.data.append(rows.count(row))
+    return out
+'''
+        self.assertEqual(sorted(self.loop_findings(code)), [
+            (7, 'string_concat_in_loop'),
+            (8, 'list_front_in_loop'),
+            (9, 'list_membership_in_loop'),
+            (10, 'regex_compile_in_loop'),
+            (11, 'nested_scan'),
+            (13, 'len_in_while'),
+            (14, 'attribute_lookup_in_loop'),
+            (14, 'list_front_in_loop'),
+            (15, 'nested_scan'),
+        ])
+
+    def test_loop_antipatterns_only_inside_loops(self):
+        code = '''
+import re
+
+def fine(items, node):
+    text = ""
+    text += "x"
+    for part in re.compile("[,;]").split(items):
+        def later():
+            return part.a.b + part.a.b
+        text = [text]
+        text += [part]
+        if part in {"a", "b"}:
+            pass
+    while node:
+        node.next.value.seen = node.next.value.count
+        node = node.next
+    return [x for x in items]
+'''
+        self.assertEqual(self.loop_findings(code), [])
+
+    def test_len_in_while_value(self):
+        code = "while len(self.queue) > 0 and len(pending()) > 1:\n    pass\n"
+        findings = analyze_code(code, config=self.get_basic_config())
+        self.assertEqual([f.value for f in findings if f.type == 'len_in_while'], ['len(self.queue)'])
+        with patch("ast.unparse", side_effect=AttributeError):
+            self.assertEqual(self.loop_findings("while len(items()):\n    pass\n"), [(1, 'len_in_while')])
+
+    def test_nested_loop_over_loop_variable(self):
+        code = '''
+def flatten(token):
+    for token in token:
+        for token in token:
+            print(token)
+    return [part for parts in token for part in parts.items]
+'''
+        self.assertEqual(self.loop_findings(code), [])
+
+    def test_long_string_concatenation(self):
+        chain = " + ".join(["'a'"] * 1200)
+        self.assertEqual(self.loop_findings(f"X = {chain}\n"), [])
+        self.assertEqual(self.loop_findings(f"s = {chain}\nfor c in 'abc':\n    s += c\n"),
+                         [(3, 'string_concat_in_loop')])
+
+    def test_loop_antipattern_severity_is_configurable(self):
+        config = self.get_basic_config()
+        config.severity = {"string_concat_in_loop": "high"}
+        findings = analyze_code("s = ''\nfor c in 'abc':\n    s += c\n", config=config)
+        self.assertEqual([(f.type, f.severity) for f in findings], [('string_concat_in_loop', 'high')])
+
+    def test_async_functions_are_checked(self):
+        code = "async def handler(a, b, c, d, e, f):\n    x = 1\n    y = 2\n    return x + y\n"
+        config = self.get_basic_config(max_lines=3)
+        config.checks["missing_docstrings"] = True
+        findings = analyze_code(code, config=config)
+        self.assertEqual(sorted(f.type for f in findings),
+                         ['argument_count', 'function_length', 'missing_docstrings'])
+        self.assertTrue(all(f.function_name == 'handler' for f in findings))
+
+    def test_blocking_calls_in_coroutines(self):
+        code = '''
+import time
+import requests as http
+from subprocess import run
+from aiofiles import open
+
+async def handler(loop):
+    time.sleep(1)
+    http.get("https://example.com")
+    run(["ls"])
+    async with open("data") as f:
+        pass
+    await loop.run_in_executor(None, lambda: time.sleep(1))
+    def in_thread():
+        time.sleep(1)
+
+def sync():
+    time.sleep(1)
+'''
+        config = self.get_basic_config()
+        findings = [f for f in analyze_code(code, config=config) if f.type == 'blocking_calls']
+        self.assertEqual([(f.line_number, f.value) for f in findings],
+                         [(8, 'time.sleep'), (9, 'requests.get'), (10, 'subprocess.run')])
+        self.assertEqual(findings[0].function_name, 'handler')
+        self.assertEqual(findings[0].severity, 'high')
+        self.assertIn('asyncio.sleep', findings[0].suggestion)
+
+        config.blocking_functions = ["subprocess.*"]
+        findings = [f for f in analyze_code(code, config=config) if f.type == 'blocking_calls']
+        self.assertEqual([f.value for f in findings], ['subprocess.run'])
+
     def test_missing_docstrings(self):
         code = '''
 def function_without_docstring():
@@ -216,6 +477,161 @@ def function_with_todos():
         self.assertIn('FIXME', todo_types)
         self.assertIn('HACK', todo_types)
 
+    def test_todo_comments_line_numbers_and_messages(self):
+        code = 'x = 1\r\ny = 2  # todo: later # and FIXME\r\n\r\n    #XXX'
+        analyzer = TodoCommentAnalyzer()
+        analyzer.analyze(code)
+        self.assertEqual(
+            [(f.line_number, f.value, f.message) for f in analyzer.findings],
+            [(2, 'FIXME', 'FIXME comment found: y = 2  # todo: later # and FIXME'),
+             (4, 'XXX', 'XXX comment found: #XXX')]
+        )
+
+    def test_accurate_todo_comments_skip_strings(self):
+        code = 'url = "http://x/#TODO"\nvalue = 1  # FIXME: real one\n'
+        fast = TodoCommentAnalyzer()
+        fast.analyze(code)
+        accurate = TodoCommentAnalyzer(accurate=True)
+        accurate.analyze(code)
+        self.assertEqual([f.line_number for f in fast.findings], [1, 2])
+        self.assertEqual([f.line_number for f in accurate.findings], [2])
+        self.assertEqual(accurate.findings[0].message, fast.findings[1].message)
+
+    def test_complexity_parses_source_once(self):
+        code = "def f(a):\n    if a:\n        return 1\n    return 2\n"
+        with patch('coderevitalize.analyzer.ast.parse', wraps=ast.parse) as mock_parse:
+            findings = analyze_code(code, config=self.get_basic_config(max_complexity=1))
+        self.assertEqual(mock_parse.call_count, 1)
+        self.assertEqual([f['type'] for f in findings], ['complexity'])
+
+    def test_complexity_accepts_parsed_tree(self):
+        code = "def f(a):\n    if a:\n        return 1\n    return 2\n"
+        findings = analyze_complexity(code, max_complexity=1, tree=ast.parse(code))
+        self.assertEqual(findings[0]['value'], 2)
+
+    def test_complexity_errors_are_reported(self):
+        with patch('radon.visitors.ComplexityVisitor.from_ast', side_effect=RuntimeError("boom")):
+            findings = analyze_code("x = 1", config=self.get_basic_config())
+        self.assertEqual(len(findings), 1)
+        self.assertEqual(findings[0]['type'], 'complexity_error')
+        self.assertIn('boom', findings[0]['message'])
+
+    def test_findings_are_compact_records(self):
+        findings = analyze_code("def f(a):\n    return a * 42\n")
+        magic = [f for f in findings if f['type'] == 'magic_numbers'][0]
+        self.assertIsInstance(magic, Finding)
+        self.assertFalse(hasattr(magic, '__dict__'))
+        self.assertEqual(magic.get('value'), 42)
+        self.assertEqual(magic.to_dict(), {
+            "type": "magic_numbers",
+            "function_name": None,
+            "line_number": 2,
+            "value": 42,
+            "severity": "low",
+            "message": "Magic number 42 found.",
+            "suggestion": "Consider using a named constant instead of a magic number."
+        })
+        other = analyze_code("x = 42\n")[0]
+        self.assertIs(magic.suggestion, other.suggestion)
+
+    def test_severity_override_applies_to_findings(self):
+        config = self.get_basic_config(max_args=1)
+        config.severity = {"argument_count": "critical"}
+        findings = analyze_code("def f(a, b):\n    pass\n", config=config)
+        self.assertEqual(findings[0]['severity'], 'critical')
+
+    def test_standalone_visit_reaches_nested_functions(self):
+        code = '''
+def outer():
+    def inner(a, b, c, d, e, f):
+        pass
+    return inner
+'''
+        analyzer = ArgumentCountAnalyzer(max_args=5)
+        analyzer.visit(ast.parse(code))
+        self.assertEqual([f['function_name'] for f in analyzer.findings], ['inner'])
+
+    def test_single_pass_matches_separate_visits(self):
+        code = '''
+def compute(a, b, c, d, e, f):
+    return a * 42 + b * 7
+'''
+        tree = ast.parse(code)
+        separate = [ArgumentCountAnalyzer(max_args=3), MagicNumberAnalyzer()]
+        for rule in separate:
+            rule.visit(tree)
+        fused = [ArgumentCountAnalyzer(max_args=3), MagicNumberAnalyzer()]
+        run_rules(tree, fused)
+        for a, b in zip(separate, fused):
+            self.assertEqual(a.findings, b.findings)
+        self.assertEqual(len(fused[1].findings), 2)
+
+    def test_leave_handlers_run_after_subtree(self):
+        events = []
+
+        class Recorder(ArgumentCountAnalyzer):
+            def visit_FunctionDef(self, node):
+                events.append(("visit", node.name))
+
+            def leave_FunctionDef(self, node):
+                events.append(("leave", node.name))
+
+        run_rules(ast.parse("def outer():\n    def inner():\n        pass\ndef last():\n    pass\n"), [Recorder()])
+        self.assertEqual(events, [("visit", "outer"), ("visit", "inner"), ("leave", "inner"),
+                                  ("leave", "outer"), ("visit", "last"), ("leave", "last")])
+
+    def test_budgets_keep_only_cheap_checks(self):
+        code = "def f(a, b, c, d, e, f):\n    # TODO: shrink\n    return a * 42\n"
+        for budget, overrides in (("bytes", {"budget_bytes": 20}), ("nodes", {"budget_nodes": 10})):
+            config = Config(**overrides)
+            findings = analyze_code(code, config=config)
+            self.assertEqual([f.type for f in findings], ["budget_exceeded", "todo_comments"])
+            self.assertEqual(findings[0].value["budget"], budget)
+            self.assertEqual(findings[0].severity, "info")
+        self.assertEqual(analyze_code(code, config=Config(budget_nodes=1000)), analyze_code(code))
+
+    def test_time_budget_skips_complexity(self):
+        code = "def f(a):\n    if a:\n        return 1\n    return 2\n"
+        findings = analyze_code(code, config=self.get_basic_config(max_complexity=1))
+        self.assertEqual([f.type for f in findings], ["complexity"])
+
+        config = self.get_basic_config(max_complexity=1)
+        config.budget_seconds = 0
+        findings = analyze_code(code, config=config)
+        self.assertEqual([f.type for f in findings], ["budget_exceeded"])
+        self.assertEqual(findings[0].value["budget"], "seconds")
+
+    def test_deep_nesting_is_over_budget(self):
+        findings = analyze_code("x = " + "-" * 200000 + "1\n")
+        self.assertEqual([f.type for f in findings], ["budget_exceeded"])
+        self.assertEqual(findings[0].value["budget"], "nesting")
+
+    def test_split_for_explanation(self):
+        code = (
+            "import os\n"
+            "\n"
+            "# Helper comment\n"
+            "@decorator\n"
+            "def first():\n"
+            "    return 1\n"
+            "\n"
+            "CONSTANT = 2\n"
+            "\n"
+            "class Second:\n"
+            "    async def method(self):\n"
+            "        pass\n"
+        )
+        chunks = split_for_explanation(code, max_lines=5)
+        self.assertEqual([(title, first, last) for title, first, last, _ in chunks], [
+            ("module-level code", 1, 2),
+            ("function first", 3, 6),
+            ("module-level code", 7, 9),
+            ("class Second", 10, 12),
+        ])
+        self.assertEqual("".join(text for _, _, _, text in chunks), code)
+        self.assertEqual(len(split_for_explanation(code)), 1)
+        self.assertEqual(len(split_for_explanation(code, "JavaScript", max_lines=5)), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from coderevitalize.analyzer import analyze_code
+from coderevitalize.async_api import AsyncAnalyzer, analyze_code_async, analyze_paths_async
+from coderevitalize.config import Config
+
+SOURCE = "import os\n\ndef f(a, b, c, d, e, f):\n    # TODO: tidy\n    return a * 42\n"
+
+
+class TestAsyncApi(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index in range(4):
+            path = os.path.join(self.tmpdir.name, f"mod_{index}.py")
+            with open(path, "w") as f:
+                f.write(SOURCE.replace("42", str(100 + index)))
+            self.paths.append(path)
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.tmpdir.cleanup()
+
+    def test_same_findings_as_sync_in_process_pool(self):
+        async def run():
+            code = await analyze_code_async(SOURCE)
+            files = await analyze_paths_async(self.paths)
+            return code, files
+
+        code, files = asyncio.run(run())
+        self.assertEqual(code, analyze_code(SOURCE))
+        self.assertEqual(list(files), self.paths)
+        for path in self.paths:
+            with open(path) as f:
+                self.assertEqual(files[path], analyze_code(f.read()))
+
+    def test_default_analyzer_survives_new_event_loops(self):
+        async def run():
+            return await asyncio.gather(*(analyze_code_async(SOURCE) for _ in range(3)))
+
+        with patch("coderevitalize.async_api.analyze_code", return_value=[]), \
+             patch.object(AsyncAnalyzer, "executor", self.executor):
+            self.assertEqual(asyncio.run(run()), [[], [], []])
+            self.assertEqual(asyncio.run(run()), [[], [], []])
+
+    def test_concurrency_is_limited(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_analyze(source_code, config=None):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return []
+
+        async def run():
+            async with AsyncAnalyzer(self.executor, max_concurrency=2) as analyzer:
+                return await analyzer.analyze_paths(self.paths, Config())
+
+        with patch("coderevitalize.async_api.analyze_code", side_effect=slow_analyze):
+            results = asyncio.run(run())
+        self.assertEqual(results, {path: [] for path in self.paths})
+        self.assertEqual(max(peak), 2)
+
+    def test_timeouts_and_cancellation(self):
+        def slow_analyze(source_code, config=None):
+            time.sleep(0.3)
+            return []
+
+        async def run():
+            analyzer = AsyncAnalyzer(self.executor, max_concurrency=4)
+            results = await analyzer.analyze_paths(self.paths[:2], timeout=0.05, return_exceptions=True)
+            with self.assertRaises(asyncio.TimeoutError):
+                await analyzer.analyze_code(SOURCE, timeout=0.05)
+
+            task = asyncio.ensure_future(analyzer.analyze_code(SOURCE))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return results
+
+        with patch("coderevitalize.async_api.analyze_code", side_effect=slow_analyze):
+            results = asyncio.run(run())
+        for error in results.values():
+            self.assertIsInstance(error, asyncio.TimeoutError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import tempfile
+from io import StringIO
+
+from coderevitalize.analyzer import analyze_code
+from coderevitalize.baseline import Baseline
+from coderevitalize.cli import main
+
+SOURCE = "def f(a, b, c, d, e, f):\n    return a * 42\n"
+
+
+class TestBaseline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, "mod.py")
+        self.baseline = os.path.join(self.tmpdir.name, "baseline.json")
+        self.write(SOURCE)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, text):
+        with open(self.source, "w") as f:
+            f.write(text)
+
+    def run_cli(self, *extra):
+        argv = ["analyze", self.tmpdir.name, "--format", "jsonl", "--no-cache", "--baseline", self.baseline, *extra]
+        with patch("sys.stdout", new_callable=StringIO) as stdout, \
+             patch("sys.stderr", new_callable=StringIO):
+            try:
+                main(argv)
+                code = 0
+            except SystemExit as e:
+                code = e.code
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        return code, [f for record in records for f in record.get("findings", [])]
+
+    def test_baseline_survives_shifted_lines(self):
+        self.assertEqual(self.run_cli("--write-baseline"), (0, []))
+        self.assertEqual(self.run_cli(), (0, []))
+
+        self.write("import os\n\n\n" + SOURCE.replace("def f(", "def  f(") + "    # TODO: later\n")
+        code, findings = self.run_cli()
+        self.assertEqual(code, 1)
+        self.assertEqual(sorted(f["type"] for f in findings), ["todo_comments", "unused_imports"])
+
+    def test_fingerprints_count_duplicates(self):
+        findings = analyze_code("x = 42\n")
+        baseline = Baseline(self.tmpdir.name)
+        with open(self.source, "w") as f:
+            f.write("x = 42\n")
+        baseline.add(self.source, findings)
+        baseline.save(self.baseline)
+
+        with open(self.source, "w") as f:
+            f.write("x = 42\nx = 42\n")
+        loaded = Baseline.load(self.baseline)
+        remaining = loaded.filter(self.source, analyze_code("x = 42\nx = 42\n"))
+        self.assertEqual([f.line_number for f in remaining if f.type == "magic_numbers"], [2])
+        self.assertEqual(loaded.suppressed, len(findings))
+
+    def test_bad_baseline_is_an_error(self):
+        with open(self.baseline, "w") as f:
+            f.write("not json")
+        self.assertEqual(self.run_cli()[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks")
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_corpus_is_reproducible(self):
+        sys.path.insert(0, BENCHMARKS)
+        try:
+            import corpus
+        finally:
+            sys.path.remove(BENCHMARKS)
+        self.assertEqual(corpus.generate("small", 0.01, seed=1), corpus.generate("small", 0.01, seed=1))
+        self.assertNotEqual(corpus.generate("small", 0.01, seed=1), corpus.generate("small", 0.01, seed=2))
+
+    def test_bench_analyzer_reports_json(self):
+        result = subprocess.run(
+            [sys.executable, os.path.join(BENCHMARKS, "bench_analyzer.py"),
+             "--profiles", "small", "--scale", "0.01", "--repeat", "1"],
+            capture_output=True, text=True, check=True,
+        )
+        profile = json.loads(result.stdout)["profiles"]["small"]
+        self.assertEqual(profile["files"], 4)
+        self.assertIn("MagicNumberAnalyzer", profile["rule_seconds"])
+        self.assertGreater(profile["analyze_code"]["files_per_second"], 0)
+        self.assertGreater(profile["cli"]["seconds"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+
+from coderevitalize.analyzer import analyze_code
+from coderevitalize.cache import ResponseCache, ResultCache, cacheable, config_fingerprint
+from coderevitalize.cli import main
+from coderevitalize.config import Config
+from coderevitalize.finding import Finding
+
+
+def make_finding(value):
+    return Finding("magic_numbers", None, 1, value, "low", f"Magic number {value} found.", "Use a constant.")
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fingerprint_tracks_result_affecting_config(self):
+        base = config_fingerprint(Config())
+        self.assertEqual(base, config_fingerprint(Config()))
+        self.assertNotEqual(base, config_fingerprint(Config(max_args=3)))
+        self.assertEqual(base, config_fingerprint(Config(exclude=["build/*"])))
+
+    def test_roundtrip(self):
+        cache = ResultCache(self.cache_dir, Config())
+        key = cache.key(b"x = 42\n")
+        self.assertIsNone(cache.get(key))
+        findings = [make_finding(42)]
+        cache.put(key, findings)
+        self.assertEqual(cache.get(key), findings)
+        self.assertNotEqual(key, ResultCache(self.cache_dir, Config(max_lines=3)).key(b"x = 42\n"))
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = ResultCache(self.cache_dir, Config())
+        keys = [cache.key(str(i).encode()) for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, [make_finding(i)])
+            os.utime(cache._path(key), (i, i))
+        entry_size = os.path.getsize(cache._path(keys[0]))
+        cache.max_bytes = entry_size
+        cache.get(keys[0])  # touching the oldest entry makes it the most recent
+
+        cache.prune()
+
+        self.assertEqual(cache.get(keys[0]), [make_finding(0)])
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNone(cache.get(keys[2]))
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, "responses")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ttl_and_lru(self):
+        cache = ResponseCache(self.cache_dir, ttl=60)
+        keys = [cache.key("model", f"prompt {i}", {"temperature": 0.5}) for i in range(3)]
+        self.assertNotEqual(keys[0], cache.key("other-model", "prompt 0", {"temperature": 0.5}))
+        for i, key in enumerate(keys):
+            cache.put(key, f"answer {i}")
+            os.utime(cache._path(key), (i, i))
+        self.assertEqual(cache.get(keys[0]), "answer 0")
+
+        cache.max_bytes = os.path.getsize(cache._path(keys[0]))
+        cache.prune()
+        self.assertEqual(cache.get(keys[0]), "answer 0")
+        self.assertIsNone(cache.get(keys[1]))
+
+        cache.ttl = 0
+        time.sleep(0.01)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertFalse(os.path.exists(cache._path(keys[0])))
+
+
+class TestAnalyzeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        self.source = os.path.join(self.tmpdir.name, "mod.py")
+        with open(self.source, "w") as f:
+            f.write("def f(a, b, c, d, e, f):\n    return 42\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_analyze(self, *extra):
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit):
+                main(['analyze', self.source, '--format=json', '--cache-dir', self.cache_dir] + list(extra))
+        return json.loads(mock_stdout.getvalue())
+
+    def test_unchanged_file_skips_analysis(self):
+        first = self.run_analyze()
+        with patch('coderevitalize.cli.analyze_code') as mock_analyze:
+            second = self.run_analyze()
+        mock_analyze.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_time_budget_results_are_not_cached(self):
+        config = Config(budget_seconds=0)
+        self.assertFalse(cacheable(analyze_code("x = 42\n", config=config)))
+        self.assertTrue(cacheable(analyze_code("x = 42\n", config=Config(budget_nodes=1))))
+
+    def test_no_cache(self):
+        self.run_analyze('--no-cache')
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,8 @@ import os
 import tempfile
 import sys
 from io import StringIO
-from coderevitalize.cli import main
+from coderevitalize.cli import main, analyze_files
+from coderevitalize.config import Config
 
 class TestCli(unittest.TestCase):
     def setUp(self):
@@ -44,9 +45,11 @@ checks:
         with self.assertRaises(SystemExit) as cm:
             main([
                 'analyze', self.temp_file.name,
+                '--config', self.config_file.name,
                 '--format=json',
                 '--max-args=5',
-                '--max-lines=5'
+                '--max-lines=5',
+                '--no-cache'
             ])
         self.assertEqual(cm.exception.code, 1)
 
@@ -56,8 +59,8 @@ checks:
         except json.JSONDecodeError:
             self.fail("Output was not valid JSON.")
 
-        self.assertIn(self.temp_file.name, output_json)
-        findings = output_json[self.temp_file.name]
+        self.assertIn(self.temp_file.name, output_json['files'])
+        findings = output_json['files'][self.temp_file.name]
         self.assertEqual(len(findings), 2)
 
         arg_finding = next((f for f in findings if f['type'] == 'argument_count'), None)
@@ -78,5 +81,69 @@ checks:
         self.assertIn('by_type', summary)
         self.assertGreaterEqual(summary['total_issues'], 2)
 
+    def run_json(self, argv):
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit):
+                main(argv)
+        return mock_stdout.getvalue()
+
+    def test_json_output_with_bytes_pattern(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "mod.py")
+            with open(path, 'w') as f:
+                f.write("import re\nfor i in range(3):\n    re.compile(b'x+')\n")
+            argv = ['analyze', path, '--format=json', '--cache-dir', os.path.join(tmpdir, 'cache')]
+            first = json.loads(self.run_json(argv))
+            self.assertEqual(json.loads(self.run_json(argv)), first)
+
+        values = [f['value'] for f in first['files'][path] if f['type'] == 'regex_compile_in_loop']
+        self.assertEqual(values, ["b'x+'"])
+
+    def test_jobs_output_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(6):
+                subdir = os.path.join(tmpdir, f"pkg{i % 2}")
+                os.makedirs(subdir, exist_ok=True)
+                with open(os.path.join(subdir, f"mod{i}.py"), 'w') as f:
+                    f.write(f"def f{i}(a, b, c, d, e, f, g):\n    return {i + 100}\n")
+
+            argv = ['analyze', tmpdir, '--format=json', '--config', self.config_file.name, '--no-cache']
+            serial = self.run_json(argv + ['--jobs', '1'])
+            parallel = self.run_json(argv + ['--jobs', '3'])
+
+        self.assertEqual(serial, parallel)
+        files = list(json.loads(serial)['files'])
+        self.assertEqual(len(files), 6)
+        self.assertEqual(files, sorted(files))
+
+    def test_analyze_files_pool_keeps_input_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(7):
+                path = os.path.join(tmpdir, f"mod{i}.py")
+                with open(path, 'w') as f:
+                    f.write("def f(" + ", ".join(f"a{j}" for j in range(i)) + "):\n    pass\n")
+                paths.append(path)
+
+            config = Config(max_args=0)
+            results = list(analyze_files(iter(paths), config, jobs=3, chunksize=2))
+
+        self.assertEqual([path for path, _ in results], paths)
+        values = [[f['value'] for f in findings if f['type'] == 'argument_count'] for _, findings in results]
+        self.assertEqual(values, [[]] + [[i] for i in range(1, 7)])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_jsonl_output(self, mock_stdout):
+        with self.assertRaises(SystemExit) as cm:
+            main(['analyze', self.temp_file.name, '--format=jsonl', '--no-cache',
+                  '--config', self.config_file.name, '--max-lines=5'])
+        self.assertEqual(cm.exception.code, 1)
+
+        records = [json.loads(line) for line in mock_stdout.getvalue().splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]['file'], self.temp_file.name)
+        self.assertEqual(len(records[0]['findings']), 2)
+        self.assertEqual(records[1]['summary']['total_issues'], 2)
+
 if __name__ == '__main__':
     unittest.main()
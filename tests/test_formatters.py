@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import patch
+import json
+from io import StringIO
+
+from coderevitalize.formatters import JsonFormatter, TextFormatter
+
+
+FINDINGS = {
+    "pkg/a.py": [
+        {"type": "magic_numbers", "function_name": None, "line_number": 3, "value": 42,
+         "severity": "low", "message": "Magic number 42 found.", "suggestion": "Use a constant."},
+        {"type": "complexity_error", "function_name": None, "line_number": None, "value": "RuntimeError",
+         "severity": "info", "message": "Complexity analysis failed: boom", "suggestion": None},
+    ],
+    "pkg/b.py": [
+        {"type": "argument_count", "function_name": "f", "line_number": 1, "value": 7,
+         "severity": "high", "message": "Too many arguments.", "suggestion": None},
+    ],
+}
+
+
+class TestFormatters(unittest.TestCase):
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_streamed_json_matches_whole_document(self, mock_stdout):
+        formatter = JsonFormatter()
+        formatter.display(FINDINGS)
+        expected = {"files": FINDINGS, "summary": formatter._generate_summary(FINDINGS)}
+        self.assertEqual(mock_stdout.getvalue(), json.dumps(expected, indent=2) + "\n")
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_streamed_json_without_files(self, mock_stdout):
+        JsonFormatter().display({})
+        self.assertEqual(json.loads(mock_stdout.getvalue())["files"], {})
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_text_output_is_written_per_file(self, mock_stdout):
+        formatter = TextFormatter()
+        formatter.start()
+        formatter.add_file("pkg/a.py", FINDINGS["pkg/a.py"])
+        self.assertIn("--- Findings in pkg/a.py ---", mock_stdout.getvalue())
+        self.assertNotIn("Summary", mock_stdout.getvalue())
+
+        formatter.add_file("pkg/b.py", FINDINGS["pkg/b.py"])
+        formatter.finish()
+        self.assertIn("Summary: 3 issues found", mock_stdout.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
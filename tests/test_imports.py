@@ -0,0 +1,40 @@
+import unittest
+import subprocess
+import sys
+import textwrap
+
+HEAVY_MODULES = ("openai", "radon", "yaml", "multiprocessing")
+
+
+class TestImportCost(unittest.TestCase):
+    def loaded_heavy_modules(self, code):
+        script = textwrap.dedent(code) + textwrap.dedent(f"""
+            import sys
+            print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+        """)
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        return [m for m in result.stdout.strip().split(",") if m]
+
+    def test_cli_import_is_lightweight(self):
+        self.assertEqual(self.loaded_heavy_modules("import coderevitalize.cli"), [])
+
+    def test_analysis_without_complexity_skips_radon(self):
+        loaded = self.loaded_heavy_modules("""
+            from coderevitalize.analyzer import analyze_code
+            from coderevitalize.config import Config
+            config = Config()
+            config.checks["complexity"] = False
+            analyze_code("def f(a):\\n    return a * 42\\n", config=config)
+        """)
+        self.assertEqual(loaded, [])
+
+    def test_complexity_loads_radon_on_demand(self):
+        loaded = self.loaded_heavy_modules("""
+            from coderevitalize.analyzer import analyze_code
+            analyze_code("def f(a):\\n    return a\\n")
+        """)
+        self.assertEqual(loaded, ["radon"])
+
+
+if __name__ == '__main__':
+    unittest.main()
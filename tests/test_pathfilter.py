@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+import fnmatch
+import os
+import tempfile
+
+from coderevitalize.cli import discover_files
+from coderevitalize.config import Config
+from coderevitalize.pathfilter import PathFilter
+
+
+def fnmatch_include(filepath, include_patterns, exclude_patterns):
+    """The original per-pattern fnmatch implementation, for comparison."""
+    filename = os.path.basename(filepath)
+    for pattern in exclude_patterns:
+        if fnmatch.fnmatch(filepath, pattern) or fnmatch.fnmatch(filename, pattern):
+            return False
+    for pattern in include_patterns:
+        if fnmatch.fnmatch(filepath, pattern) or fnmatch.fnmatch(filename, pattern):
+            return True
+    return False
+
+
+class TestPathFilter(unittest.TestCase):
+    def test_matches_fnmatch_semantics(self):
+        include = ["*.py", "scripts/run?"]
+        exclude = ["test_*.py", "*/migrations/*", "setup.py", "[abc]*.py"]
+        paths = [
+            "mod.py", "test_mod.py", "pkg/test_mod.py", "app/migrations/0001.py",
+            "migrations/0001.py", "setup.py", "pkg/setup.py", "alpha.py", "pkg/beta.py",
+            "delta.py", "scripts/run1", "scripts/run10", "README.md",
+        ]
+        path_filter = PathFilter(include, exclude)
+        for path in paths:
+            self.assertEqual(
+                path_filter.includes(path), fnmatch_include(path, include, exclude), path
+            )
+
+    def test_directory_patterns(self):
+        path_filter = PathFilter(["*.py"], [".venv/", "build/*"])
+        self.assertTrue(path_filter.excludes_dir(".venv"))
+        self.assertTrue(path_filter.excludes_dir(os.path.join("sub", ".venv")))
+        self.assertTrue(path_filter.excludes_dir("build"))
+        self.assertFalse(path_filter.excludes_dir(os.path.join("sub", "build")))
+        self.assertFalse(path_filter.includes(os.path.join("sub", ".venv", "lib", "x.py")))
+        self.assertTrue(path_filter.includes(os.path.join("sub", "build", "x.py")))
+
+    def test_walk_prunes_excluded_directories(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ["keep/a.py", ".venv/lib/b.py", "build/c.py", "d.py"]:
+                path = os.path.join(tmpdir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, "w").close()
+
+            config = Config(exclude=[".venv/", "build/*"])
+            with patch.object(PathFilter, "includes", autospec=True, side_effect=PathFilter.includes) as mock_includes:
+                found = list(discover_files(tmpdir, config))
+
+        checked = {os.path.basename(call.args[1]) for call in mock_includes.call_args_list}
+        self.assertEqual(checked, {"a.py", "d.py"})
+        self.assertEqual(found, [os.path.join(tmpdir, "d.py"), os.path.join(tmpdir, "keep", "a.py")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import tempfile
+from io import StringIO
+
+from coderevitalize.analyzer import analyze_code
+from coderevitalize.cli import main
+from coderevitalize.profiling import Profiler
+
+
+class TestProfiling(unittest.TestCase):
+    def test_analyze_code_fills_timings(self):
+        timings = {}
+        analyze_code("import os\n\ndef f(a):\n    # TODO: x\n    return a * 42\n", timings=timings)
+        for key in ("parse", "ArgumentCountAnalyzer", "UnusedImportAnalyzer", "MagicNumberAnalyzer",
+                    "analyze_complexity", "TodoCommentAnalyzer"):
+            self.assertIn(key, timings)
+            self.assertGreaterEqual(timings[key], 0.0)
+
+    def test_profiler_keeps_only_the_slowest_files(self):
+        profiler = Profiler(top=2)
+        for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+            profiler.record(f"f{i}.py", {"total": seconds, "parse": 0.01, "bytes_read": 10,
+                                         "cached": i == 1, "MagicNumberAnalyzer": seconds / 2})
+        report = profiler.report()
+        self.assertEqual([entry["file"] for entry in report["slowest_files"]], ["f2.py", "f0.py"])
+        self.assertEqual(report["files_profiled"], 4)
+        self.assertEqual(report["cache_hits"], 1)
+        self.assertEqual(report["bytes_read"], 40)
+        self.assertAlmostEqual(report["slowest_rules"][0]["seconds"], 0.55)
+
+    def test_cli_profile_in_json(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("a.py", "b.py"):
+                with open(os.path.join(tmpdir, name), "w") as f:
+                    f.write("def f(a):\n    return a * 42\n")
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                with self.assertRaises(SystemExit):
+                    main(['analyze', tmpdir, '--format=json', '--no-cache', '--profile', '--profile-top', '1'])
+
+        output = json.loads(mock_stdout.getvalue())
+        self.assertIn('summary', output)
+        profile = output['profile']
+        self.assertEqual(profile['files_profiled'], 2)
+        self.assertEqual(len(profile['slowest_files']), 1)
+        self.assertGreater(profile['bytes_read'], 0)
+        self.assertEqual(len(profile['slowest_rules']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
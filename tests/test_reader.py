@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch
+import os
+import tempfile
+from io import StringIO
+
+from coderevitalize.analyzer import analyze_code
+from coderevitalize.cli import process_file
+from coderevitalize.config import Config
+from coderevitalize.reader import MMAP_THRESHOLD, SkippedFile, read_source
+
+
+class TestReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, data, name="mod.py"):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_encoding_cookie_is_honored(self):
+        source = "# -*- coding: latin-1 -*-\ndef f():\n    # TODO: café\n    return 42\n"
+        path = self.write(source.encode("latin-1"))
+        with patch("sys.stderr", new_callable=StringIO) as stderr:
+            findings = process_file(path, Config())
+        self.assertEqual(stderr.getvalue(), "")
+        todo = [f for f in findings if f.type == "todo_comments"]
+        self.assertEqual(todo[0].message, "TODO comment found: # TODO: café")
+        self.assertEqual(findings, analyze_code(source, config=Config()))
+
+    def test_bad_bytes_are_a_syntax_error(self):
+        findings = analyze_code(b"x = '\xff'\n")
+        self.assertEqual([f.type for f in findings], ["syntax_error"])
+
+    def test_large_files_are_mapped(self):
+        data = b"x = 1\n" * (MMAP_THRESHOLD // 6 + 1)
+        self.assertEqual(read_source(self.write(data)), data)
+
+    def test_oversized_files_are_skipped(self):
+        path = self.write(b"x = 1\n" * 100)
+        with self.assertRaises(SkippedFile):
+            read_source(path, max_bytes=100)
+        self.assertEqual(len(read_source(path, max_bytes=0)), 600)
+
+    def test_generated_and_minified_files_are_skipped(self):
+        generated = self.write(b"# Code generated by protoc. DO NOT EDIT.\nx = 42\n", "gen_pb2.py")
+        minified = self.write(b";".join(b"v%d=%d" % (i, i) for i in range(2000)) + b"\n", "min.py")
+        for path in (generated, minified):
+            with self.assertRaises(SkippedFile):
+                read_source(path)
+            self.assertTrue(read_source(path, skip_generated=False))
+
+        with patch("sys.stderr", new_callable=StringIO) as stderr:
+            self.assertEqual(process_file(generated, Config()), [])
+        self.assertIn("Skipping", stderr.getvalue())
+        self.assertIn("generated", stderr.getvalue())
+        self.assertTrue(process_file(generated, Config(skip_generated=False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+
+from coderevitalize.cli import main
+from coderevitalize.server import AnalysisServer, request
+
+SOURCE = "def f(a, b, c, d, e, f):\n    return a * 42\n"
+
+
+@unittest.skipIf(AnalysisServer is None, "Unix domain sockets are not available")
+class TestAnalysisServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, "server.sock")
+        self.source = os.path.join(self.tmpdir.name, "mod.py")
+        with open(self.source, "w") as f:
+            f.write(SOURCE)
+
+        self.server = AnalysisServer(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        request(self.socket_path, {"command": "shutdown"})
+        self.thread.join(timeout=5)
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def stats(self):
+        return request(self.socket_path, {"command": "stats"})
+
+    def test_file_results_are_kept_in_memory(self):
+        first = request(self.socket_path, {"command": "analyze", "paths": [self.source]})
+        second = request(self.socket_path, {"command": "analyze", "paths": [self.source]})
+
+        self.assertEqual(first, second)
+        types = {f["type"] for f in first["files"][self.source]}
+        self.assertIn("argument_count", types)
+        self.assertEqual((self.stats()["hits"], self.stats()["misses"]), (1, 1))
+
+        with open(self.source, "w") as f:
+            f.write("x = 1\n")
+        third = request(self.socket_path, {"command": "analyze", "paths": [self.source]})
+        self.assertEqual(third["files"][self.source], [])
+        self.assertEqual(self.stats()["misses"], 2)
+
+    def test_buffer_shares_results_with_identical_file(self):
+        request(self.socket_path, {"command": "analyze", "paths": [self.source]})
+        response = request(self.socket_path, {"command": "analyze", "source": SOURCE, "path": self.source})
+        self.assertIn(self.source, response["files"])
+        self.assertEqual(self.stats()["hits"], 1)
+
+    def test_errors_and_unknown_commands(self):
+        missing = os.path.join(self.tmpdir.name, "missing.py")
+        response = request(self.socket_path, {"command": "analyze", "paths": [missing]})
+        self.assertIn(missing, response["errors"])
+        self.assertFalse(request(self.socket_path, {"command": "bogus"})["ok"])
+
+    def test_cli_client_matches_local_analysis(self):
+        def run(*extra):
+            with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+                with self.assertRaises(SystemExit):
+                    main(['analyze', self.source, '--format=json', '--no-cache'] + list(extra))
+            return json.loads(mock_stdout.getvalue())
+
+        self.assertEqual(run(), run('--server', self.socket_path))
+
+    def test_cli_client_sends_its_config(self):
+        def run(*extra):
+            with patch('sys.stdout', new_callable=StringIO):
+                try:
+                    main(['analyze', self.source, '--format=json', '--no-cache', '--max-args', '10'] + list(extra))
+                except SystemExit as e:
+                    return e.code
+            return 0
+
+        with open(os.path.join(self.tmpdir.name, ".coderevitalize.yaml"), "w") as f:
+            f.write("checks:\n  magic_numbers: false\n  missing_docstrings: false\n")
+        self.assertEqual(run(), 0)
+        self.assertEqual(run('--server', self.socket_path), 0)
+        self.assertEqual(run('--max-args', '1', '--server', self.socket_path), 1)
+
+        response = request(self.socket_path, {"command": "analyze", "paths": [self.source], "config": {"bogus": 1}})
+        self.assertFalse(response["ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()
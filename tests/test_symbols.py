@@ -0,0 +1,159 @@
+import ast
+import unittest
+from unittest.mock import patch
+import json
+import os
+import tempfile
+from io import StringIO
+
+from coderevitalize.cli import analyze_files, apply_symbol_index, discover_files, main, open_symbol_index
+from coderevitalize.config import Config
+from coderevitalize.symbols import module_name
+
+FILES = {
+    "pkg/__init__.py": 'from .core import api, helper, internal\n__all__ = ["api"]\n',
+    "pkg/core.py": (
+        "import os\n"
+        "\n"
+        "def api():\n    pass\n"
+        "def helper():\n    pass\n"
+        "def internal():\n    pass\n"
+        "def unused_func():\n    pass\n"
+        "class Unused:\n    pass\n"
+        "def _private():\n    pass\n"
+        "value = _private()\n"
+    ),
+    "app.py": "import pkg\nfrom pkg import helper\n\nhelper()\npkg.internal()\n\ndef main():\n    pass\n",
+    "test_app.py": "def test_main():\n    pass\n",
+}
+
+CONFIG = '''
+project_analysis: true
+checks:
+  missing_docstrings: false
+  magic_numbers: false
+  todo_comments: false
+'''
+
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, "project")
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        for relative_path, source in FILES.items():
+            self.write(relative_path, source)
+        self.write(".coderevitalize.yaml", CONFIG)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, relative_path, source):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+
+    def build_index(self, config):
+        """Analyze the project as the CLI does and return the updated index."""
+        index = open_symbol_index(self.root, self.cache_dir)
+        results = analyze_files(discover_files(self.root, config), config, symbols=index)
+        list(apply_symbol_index(results, index, config, self.cache_dir))
+        return index
+
+    def test_module_name(self):
+        self.assertEqual(module_name(os.path.join("pkg", "sub", "__init__.py")), "pkg.sub")
+        self.assertEqual(module_name(os.path.join("pkg", "core.py")), "pkg.core")
+
+    def test_cross_module_findings(self):
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            with self.assertRaises(SystemExit):
+                main(["analyze", self.root, "--format", "jsonl", "--cache-dir", self.cache_dir, "-j", "1"])
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        found = {
+            (os.path.relpath(record["file"], self.root), f["type"], f["value"])
+            for record in records if "file" in record for f in record["findings"]
+        }
+        self.assertEqual(found, {
+            (os.path.join("pkg", "core.py"), "unused_imports", "os"),
+            (os.path.join("pkg", "core.py"), "dead_code", "unused_func"),
+            (os.path.join("pkg", "core.py"), "dead_code", "Unused"),
+        })
+
+    def test_each_file_is_parsed_once(self):
+        parse = ast.parse
+        with patch("ast.parse", side_effect=parse) as parsed:
+            records = self.analyze()
+            self.assertEqual(parsed.call_count, len(FILES))
+            parsed.reset_mock()
+            self.assertEqual(self.analyze(), records)
+            self.assertEqual(parsed.call_count, 0)
+
+        # A cached file whose table is outdated is parsed for the table only
+        os.utime(os.path.join(self.root, "app.py"))
+        with patch("ast.parse", side_effect=parse) as parsed:
+            self.assertEqual(self.analyze(), records)
+            self.assertEqual(parsed.call_count, 1)
+
+    def analyze(self):
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            with self.assertRaises(SystemExit):
+                main(["analyze", self.root, "--format", "jsonl", "--cache-dir", self.cache_dir, "-j", "1"])
+        return [json.loads(line) for line in stdout.getvalue().splitlines() if '"file"' in line]
+
+    def test_reexports_in_src_layout(self):
+        self.write("src/lib/__init__.py", "")
+        self.write("src/lib/core.py", "def helper():\n    pass\n")
+        self.write("src/lib/api.py", "from .core import helper\nfrom .core import unused\n")
+        self.write("tests/test_api.py", "from lib.api import helper\n\ndef test_helper():\n    helper()\n")
+        api = os.path.join(self.root, "src", "lib", "api.py")
+        index = self.build_index(Config(project_analysis=True))
+
+        self.assertEqual(index.files[os.path.join("src", "lib", "api.py")]["module"], "src.lib.api")
+        self.assertTrue(index.is_reexported(api, "helper"))
+        self.assertFalse(index.is_reexported(api, "unused"))
+
+    def test_index_is_incremental(self):
+        config = Config(project_analysis=True)
+        self.assertEqual(self.build_index(config).reprocessed, len(FILES))
+        self.assertEqual(self.build_index(config).reprocessed, 0)
+
+        self.write("app.py", FILES["app.py"] + "from pkg.core import unused_func\nunused_func()\n")
+        os.remove(os.path.join(self.root, "test_app.py"))
+        index = self.build_index(config)
+        self.assertEqual(index.reprocessed, 1)
+        self.assertEqual(len(index.files), len(FILES) - 1)
+        dead = index.dead_code(os.path.join(self.root, "pkg", "core.py"))
+        self.assertEqual([f.value for f in dead], ["Unused"])
+
+    def test_duplicates_across_modules(self):
+        body = (
+            "    total = 0\n"
+            "    for {item} in {items}:\n"
+            "        if {item}.get('active') and {item}['count'] > 3:\n"
+            "            total += {item}['count'] * 2\n"
+            "        elif {item}.get('pending'):\n"
+            "            total -= 1\n"
+            "    return total\n"
+        )
+        self.write("pkg/reports.py", "def tally(rows):\n" + body.format(item="row", items="rows"))
+        self.write("pkg/stats.py", "def count_all(entries):\n" + body.format(item="entry", items="entries"))
+        config = Config(project_analysis=True)
+        index = self.build_index(config)
+
+        self.assertEqual(index.duplicates(os.path.join(self.root, "pkg", "reports.py")), [])
+        findings = index.apply(os.path.join(self.root, "pkg", "stats.py"), [], config)
+        duplicates = [f for f in findings if f.type == "duplicate_code"]
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0].function_name, "count_all")
+        self.assertEqual(duplicates[0].value["duplicate_of"], "tally")
+        self.assertEqual(duplicates[0].value["file"], os.path.join("pkg", "reports.py"))
+
+        config.checks["duplicate_code"] = False
+        index = self.build_index(config)
+        self.assertEqual(index.reprocessed, len(FILES) + 2)
+        self.assertEqual(index.duplicates(os.path.join(self.root, "pkg", "stats.py")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
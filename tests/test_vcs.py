@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import subprocess
+import tempfile
+from io import StringIO
+
+from coderevitalize import vcs
+from coderevitalize.cli import main
+
+
+class TestGitChangedFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = self.tmpdir.name
+        self.git("init", "-q")
+        self.write("kept.py", "def kept():\n    return 1\n")
+        self.write("changed.py", "def changed():\n    return 1\n")
+        self.write("notes.txt", "hello\n")
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", "initial")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def git(self, *args):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+            cwd=self.repo, check=True, capture_output=True,
+        )
+
+    def write(self, name, content):
+        path = os.path.join(self.repo, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def run_analyze(self, *extra):
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            with self.assertRaises(SystemExit) as cm:
+                main(['analyze', self.repo, '--format=json', '--no-cache', '--max-args=2'] + list(extra))
+        output = mock_stdout.getvalue()
+        return cm.exception.code, json.loads(output) if output else None
+
+    def test_changed_files_since_revision(self):
+        self.write("changed.py", "def changed(a, b, c):\n    return 1\n")
+        self.write("pkg/new.py", "x = 1\n")
+        self.write("notes.txt", "changed\n")
+        self.git("add", "pkg/new.py")
+
+        files = vcs.changed_files(self.repo, since="HEAD")
+
+        real = os.path.realpath(self.repo)
+        self.assertEqual(files, [os.path.join(real, "changed.py"), os.path.join(real, "pkg", "new.py")])
+
+    def test_staged_only(self):
+        self.write("changed.py", "def changed(a, b, c):\n    return 1\n")
+        self.write("kept.py", "def kept(a, b, c):\n    return 1\n")
+        self.git("add", "kept.py")
+
+        files = vcs.changed_files(self.repo, staged=True)
+
+        self.assertEqual(files, [os.path.join(os.path.realpath(self.repo), "kept.py")])
+
+    def test_changed_lines(self):
+        self.write("changed.py", "import os\n\ndef changed():\n    return 1\n")
+        ranges = vcs.changed_lines(self.repo, since="HEAD")
+        self.assertEqual(ranges[os.path.join(os.path.realpath(self.repo), "changed.py")], [(1, 2)])
+
+    def test_changed_lines_ignore_diff_config(self):
+        self.git("config", "diff.noprefix", "true")
+        self.git("config", "color.diff", "always")
+        self.write("changed.py", "def changed(a, b, c):\n    return 1\n")
+
+        code, output = self.run_analyze('--since', 'HEAD', '--changed-lines')
+
+        self.assertEqual(code, 1)
+        findings = output['files'][os.path.join(self.repo, "changed.py")]
+        self.assertEqual([f['type'] for f in findings if f['type'] == 'argument_count'], ['argument_count'])
+        self.assertEqual(vcs.changed_files(self.repo, since="HEAD"),
+                         [os.path.join(os.path.realpath(self.repo), "changed.py")])
+
+    def test_analyze_since_honors_exclude(self):
+        self.write("changed.py", "def changed(a, b, c):\n    return 1\n")
+        self.write("gen/skip.py", "def skip(a, b, c):\n    return 1\n")
+        self.write(".coderevitalize.yaml", "exclude:\n  - 'gen/*'\n")
+
+        code, output = self.run_analyze('--since', 'HEAD')
+
+        self.assertEqual(code, 1)
+        self.assertEqual(list(output['files']), [os.path.join(self.repo, "changed.py")])
+
+    def test_analyze_changed_lines_filters_findings(self):
+        self.write("kept.py", "def kept(a, b, c):\n    return 1\n\n\ndef extra():\n    return 1\n")
+        self.git("commit", "-qam", "args")
+        self.write("kept.py", "def kept(a, b, c):\n    return 1\n\n\ndef extra(a, b, c):\n    return 1\n")
+
+        code, output = self.run_analyze('--since', 'HEAD', '--changed-lines')
+
+        findings = output['files'][os.path.join(self.repo, "kept.py")]
+        self.assertEqual([f['function_name'] for f in findings if f['type'] == 'argument_count'], ['extra'])
+
+    def test_bad_revision(self):
+        with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+            with self.assertRaises(SystemExit) as cm:
+                main(['analyze', self.repo, '--since', 'no-such-rev'])
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("git diff", mock_stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
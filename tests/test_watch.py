@@ -0,0 +1,145 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+
+from coderevitalize.cli import main, watch_changes
+from coderevitalize.config import Config
+from coderevitalize.finding import Finding
+from coderevitalize.watch import RESCAN, InotifyWatcher, PollingWatcher, Watcher, diff_findings
+
+
+def magic(value, line):
+    return Finding(type="magic_numbers", function_name=None, line_number=line, value=value, severity="low",
+                   message=f"Magic number {value} found.")
+
+
+class ScriptedWatcher(Watcher):
+    """Replays fixed batches, running ``before`` ahead of each one."""
+
+    def __init__(self, root, steps):
+        super().__init__(root, Config())
+        self.steps = steps
+
+    def batches(self, debounce=0.2, max_wait=2.0):
+        for before, batch in self.steps:
+            before()
+            yield batch
+
+
+class TestDiffFindings(unittest.TestCase):
+    def test_moved_findings_are_not_reported(self):
+        old = [magic(42, 3), magic(7, 4)]
+        new = [magic(42, 10), magic(99, 11)]
+        introduced, resolved = diff_findings(old, new)
+        self.assertEqual(introduced, [magic(99, 11)])
+        self.assertEqual(resolved, [magic(7, 4)])
+
+    def test_duplicates_are_counted(self):
+        introduced, resolved = diff_findings([magic(42, 1)], [magic(42, 1), magic(42, 2)])
+        self.assertEqual([f.value for f in introduced], [42])
+        self.assertEqual(resolved, [])
+
+
+class TestWatchers(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.mkdir(os.path.join(self.root, "build"))
+        self.config = Config()
+        self.config.exclude = ["build/*"]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text="x = 1\n"):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def check_batches(self, watcher):
+        kept = self.write("kept.py")
+        # mtime granularity can hide a rewrite from the polling watcher
+        time.sleep(0.05)
+        batches = watcher.batches(debounce=0.1, max_wait=1.0)
+        try:
+            new = self.write("pkg/new.py")
+            self.write("build/ignored.py")
+            self.write("notes.txt")
+            os.unlink(kept)
+            changed = next(batches)
+        finally:
+            watcher.close()
+        self.assertEqual(changed, {kept, new})
+
+    def test_polling_watcher(self):
+        self.write("kept.py", "")
+        self.check_batches(PollingWatcher(self.root, self.config, interval=0.02))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_watcher(self):
+        self.check_batches(InotifyWatcher(self.root, self.config))
+
+
+class TestWatchChanges(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.module = os.path.join(self.root, "mod.py")
+        self.write("def f(a):\n    return a * 42\n")
+        self.config = Config()
+        self.config.checks = {"unused_imports": False, "missing_docstrings": False, "todo_comments": False}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, text):
+        with open(self.module, "w") as f:
+            f.write(text)
+
+    def test_reports_new_and_resolved_findings(self):
+        watcher = ScriptedWatcher(self.root, [
+            (lambda: self.write("def f(a):\n    b = 7\n    return a * 42\n"), {self.module}),
+            (lambda: self.write("def f(a):\n    return a * 7\n"), {self.module}),
+            (lambda: None, {self.module}),
+            (lambda: os.unlink(self.module), RESCAN),
+        ])
+        updates = list(watch_changes(self.root, self.config, watcher))
+
+        self.assertEqual([f.value for f in updates[0][self.module]], [42])
+        summaries = [
+            {path: ([f.value for f in new], [f.value for f in gone]) for path, (new, gone) in changes.items()}
+            for changes in updates[1:]
+        ]
+        # The unchanged third batch produces no update at all
+        self.assertEqual(summaries, [
+            {self.module: ([7], [])},
+            {self.module: ([], [42])},
+            {self.module: ([], [7])},
+        ])
+
+    def test_cli_watch_prints_changes(self):
+        watcher = ScriptedWatcher(self.root, [
+            (lambda: self.write("x = 7\n"), {self.module}),
+        ])
+        with patch("coderevitalize.watch.make_watcher", return_value=watcher), \
+             patch("sys.stdout", new_callable=StringIO) as stdout, \
+             patch("sys.stderr", new_callable=StringIO):
+            main(["analyze", self.root, "--watch", "--format", "jsonl", "--no-cache", "-j", "1"])
+
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(records[0]["file"], self.module)
+        self.assertIn("summary", records[1])
+        self.assertEqual(records[2]["file"], self.module)
+        self.assertEqual([f["value"] for f in records[2]["new"]], [7])
+        self.assertIn(42, [f["value"] for f in records[2]["resolved"]])
+
+
+if __name__ == '__main__':
+    unittest.main()